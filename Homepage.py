@@ -1,5 +1,4 @@
 import streamlit as st
-from PIL import Image
 
 # ==== Page Config ====
 st.set_page_config(
@@ -7,29 +6,25 @@ st.set_page_config(
     layout="wide"
 )
 
-# ==== Apply global styles (Inter font + sidebar color) ====
-from utils import apply_global_styles
-apply_global_styles()
-
-def local_css(file_name):
-    with open(file_name) as f:
-        st.markdown('<style>{}</style>'.format(f.read()), unsafe_allow_html=True)
+# ==== Stage timings for this rerun (opt-in: ?profile=1 or ECS_PROFILE=1) ====
+import profiling
+profiling.start_run("Homepage")
 
-local_css("style/style.css")
+# ==== Background warm-up of the shared caches (warmup.py; started once per process) ====
+import warmup
+warmup.start()
 
-# ==== Import Google Fonts + Fade-in CSS ====
-st.markdown("""
-    <link href="https://fonts.googleapis.com/css2?family=Inter&family=Bungee&display=swap" rel="stylesheet">
-    <style>
-        .fade-in {
-            animation: fadeIn 1.5s ease-in;
-        }
-        @keyframes fadeIn {
-            0% {opacity: 0;}
-            100% {opacity: 1;}
-        }
-    </style>
-""", unsafe_allow_html=True)
+# ==== Apply global styles (Inter/Bungee fonts, sidebar color, style.css) + Fade-in CSS ====
+from utils import apply_global_styles
+apply_global_styles("""
+    .fade-in {
+        animation: fadeIn 1.5s ease-in;
+    }
+    @keyframes fadeIn {
+        0% {opacity: 0;}
+        100% {opacity: 1;}
+    }
+""")
 
 # ==== HEADER ====
 st.markdown("""
@@ -63,6 +58,9 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ==== TEAM MEMBERS ====
+# Photos go out as thumbnails pre-resized to their display width (built once, cached on disk)
+from thumbnails import thumbnail
+
 team_members = [
     {"name": "Nguyễn Kiều Anh", "image": "image/Nguyen Kieu Anh.png"},
     {"name": "Lê Nguyễn Khánh Phương", "image": "image/Le Nguyen Khanh Phuong.png"},
@@ -78,7 +76,7 @@ top_row = team_members[:4]
 cols_top = st.columns(len(top_row))
 for col, member in zip(cols_top, top_row):
     with col:
-        st.image(member["image"], width=250)
+        st.image(thumbnail(member["image"], 250), width=250)
         st.markdown(
             f"<div style='text-align:center; font-family: \"Inter\", sans-serif; font-weight:bold; font-size:15px; color:black'>{member['name']}</div>",
             unsafe_allow_html=True
@@ -89,8 +87,10 @@ bottom_row = team_members[4:]
 cols_bot = st.columns([1, 3, 3, 3, 1])  # center 3 members
 for i, member in enumerate(bottom_row):
     with cols_bot[i + 1]:
-        st.image(member["image"], width=300)
+        st.image(thumbnail(member["image"], 300), width=300)
         st.markdown(
             f"<div style='text-align:center; font-family: \"Inter\", sans-serif; font-weight:bold; font-size:15px; color:black'>{member['name']}</div>",
             unsafe_allow_html=True
         )
+
+profiling.finish_run()
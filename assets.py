@@ -0,0 +1,86 @@
+import functools
+import os
+import re
+
+# ==== Asset locations ====
+STYLE_FILE = "style/style.css"
+# Served by Streamlit itself (server.enableStaticServing in .streamlit/config.toml),
+# so pages never wait on Google Fonts
+FONT_DIR = "static/fonts"
+FONT_URL = "app/static/fonts"
+FONTS = [
+    ("Inter", 400, "Inter-Regular.woff2"),
+    ("Inter", 700, "Inter-Bold.woff2"),
+    ("Bungee", 400, "Bungee-Regular.woff2"),
+]
+
+# ==== Áp dụng font và CSS toàn cục ====
+GLOBAL_CSS = """
+    * {
+        font-family: 'Inter', sans-serif;
+    }
+
+    /* Sidebar font and color */
+    section[data-testid="stSidebar"] *,
+    section[data-testid="stSidebar"] {
+        font-family: 'Inter', sans-serif !important;
+        color: #333 !important;
+    }
+
+    /* Gender multiselect tags */
+    [data-baseweb="tag"] {
+        background-color: #ffd7b5 !important;
+        color: white !important;
+    }
+
+    /* Phần hiển thị đã chọn */
+    div[data-baseweb="select"] > div {
+        background-color: #FFF3E0 !important;
+        border: 2px solid #cf5a2e !important;
+        color: #333 !important;
+    }
+
+    [data-testid="stMetricLabel"] {
+        color: #333 !important;
+    }
+
+    label, p {
+        color: #333 !important;
+    }
+"""
+
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def font_faces():
+    # local() first: an installed copy costs nothing; the bundled file is the fallback.
+    # A family with no bundled file (Bungee is not shipped yet) is declared with local()
+    # only: no page ever fetches a font from outside, and without an installed copy the
+    # page's generic fallback (e.g. "Bungee", sans-serif) is used.
+    rules = []
+    for family, weight, file_name in FONTS:
+        # local() by full and PostScript name of this face (e.g. "Inter Bold", "Inter-Bold")
+        face = os.path.splitext(file_name)[0]
+        sources = [f'local("{face.replace("-", " ")}")', f'local("{face}")']
+        if os.path.exists(os.path.join(FONT_DIR, file_name)):
+            sources.append(f'url("{FONT_URL}/{file_name}") format("woff2")')
+        rules.append(
+            f"@font-face {{ font-family: '{family}'; font-weight: {weight}; font-display: swap; "
+            f"src: {', '.join(sources)}; }}"
+        )
+    return "\n".join(rules)
+
+
+# ==== One minified <style> block per page, built once per process ====
+@functools.lru_cache(maxsize=None)
+def style_bundle(page_css=""):
+    with open(STYLE_FILE) as f:
+        style_css = f.read()
+    css = "\n".join([font_faces(), GLOBAL_CSS, style_css, page_css])
+    return f"<style>{minify_css(css)}</style>"
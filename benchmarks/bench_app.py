@@ -0,0 +1,323 @@
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Pages import the project's modules and open files relative to the repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+# Every run measures the same thing: no result cache or precomputed file left by earlier
+# runs, no warm-up thread competing with the timed reruns. Set before any page is imported.
+os.environ["ECS_RESULT_CACHE"] = "none"
+os.environ["ECS_WARMUP"] = "0"
+os.environ["ECS_PRECOMPUTED"] = os.path.join(ROOT, "benchmarks", "no-precomputed.pkl")  # never created
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import chart_cache  # noqa: E402
+import data_browser  # noqa: E402
+import source_index  # noqa: E402
+import thumbnails  # noqa: E402
+
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "baseline.json")
+TIMEOUT = 120
+MIN_PAGE_SAMPLES = 100  # timed reruns per page at least, split over its scenarios
+
+# ==== Caches keyed by widget state, emptied before each cold rerun ====
+# Warm reruns of an unchanged state are all cache hits. A cold rerun measures a state
+# nothing has asked for yet: slicing, KDE, aggregates, figures, browser rows, highlighting.
+# What depends only on the dataset (frame, cube, filter index) stays loaded.
+STATE_CACHES = [
+    chart_cache.get_chart_cache,
+    data_browser.get_row_cache,
+    source_index._load_source,
+    thumbnails._thumbnail_bytes,
+]
+
+
+def clear_state_caches():
+    for cached in STATE_CACHES:
+        cached.clear()
+
+
+def timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    return (time.perf_counter() - start) * 1000
+
+
+def peak_kb(at):
+    tracemalloc.start()
+    at.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+# ==== Widget-state matrix for the chart page ====
+GENDER_SETS = [None, ["Female"], ["Male", "Other"]]  # None: every gender (the default)
+LEVELS = ["Entry", "Mid", "Senior", "Executive"]
+AGE_RANGES = [None, (22, 26)]  # None: the slider's full range
+STATUS_SETS = [(True, True), (True, False), (False, True)]  # (Yes, No) checkboxes
+CHART_VIEWS = [
+    ("📈 Demographics", "Gender Distribution"),
+    ("📈 Demographics", "Field of Study"),
+    ("📊 Job Offers", None),
+]
+
+# ==== Other pages ====
+BROWSER_STATES = [
+    ("default", "", "(none)", "Asc", 25),
+    ("search", "Engineer", "(none)", "Asc", 25),
+    ("sorted", "", "Starting_Salary", "Desc", 100),
+    ("large-page", "", "Age", "Asc", 250),
+]
+CODE_FILES = ["Homepage.py", "data_loader.py", "pages/2_Chart.py"]
+
+
+def chart_state(at, genders, level, ages, statuses, view):
+    tab, option = view
+    sidebar = at.sidebar
+    sidebar.multiselect[0].set_value(genders if genders is not None else sidebar.multiselect[0].options)
+    sidebar.selectbox[0].set_value(level)
+    slider = sidebar.slider[0]
+    slider.set_value(ages if ages is not None else (slider.min, slider.max))
+    sidebar.checkbox[0].set_value(statuses[0])
+    sidebar.checkbox[1].set_value(statuses[1])
+    at.session_state["chart_tab"] = tab
+    at.run()
+    if option is not None:
+        # The variable selector lives inside the Demographics tab
+        selector = [s for s in at.main.selectbox if s.label.startswith("Select Variable")][0]
+        if selector.value != option:
+            selector.set_value(option)
+            at.run()
+
+
+def browser_state(at, search, sort_column, order, page_size):
+    at.text_input(key="browser_search").set_value(search)
+    at.selectbox(key="browser_sort").set_value(sort_column)
+    at.radio(key="browser_order").set_value(order)
+    at.selectbox(key="browser_size").set_value(page_size)
+    at.run()
+
+
+def code_state(at, file_name):
+    at.selectbox[0].set_value(file_name)
+    at.run()
+
+
+def scenarios():
+    # (page, scenario name, function putting the session into that state)
+    yield "Homepage.py", "home", lambda at: at.run()
+    for name, *state in BROWSER_STATES:
+        yield "pages/1_Dataset overview.py", f"dataset/{name}", lambda at, s=state: browser_state(at, *s)
+    for genders in GENDER_SETS:
+        for level in LEVELS:
+            for ages in AGE_RANGES:
+                for statuses in STATUS_SETS:
+                    for view in CHART_VIEWS:
+                        name = "chart/{}/{}/{}/{}/{}".format(
+                            "all" if genders is None else "+".join(genders),
+                            level,
+                            "all" if ages is None else f"{ages[0]}-{ages[1]}",
+                            "+".join(s for s, on in zip(("Yes", "No"), statuses) if on),
+                            view[1] or "Job Offers",
+                        )
+                        yield "pages/2_Chart.py", name, (
+                            lambda at, s=(genders, level, ages, statuses, view): chart_state(at, *s)
+                        )
+    for file_name in CODE_FILES:
+        yield "pages/3_Code.py", f"code/{file_name}", lambda at, f=file_name: code_state(at, f)
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+# ==== One session per page; each scenario changes its widgets, then reruns it ====
+def run_benchmarks(repeat, cold_repeat, only=None, names=None):
+    # only: a substring of the scenario names to run; names: exactly these scenarios
+    selected = [scenario for scenario in scenarios()
+                if (not only or only in scenario[1]) and (names is None or scenario[1] in names)]
+    # Pages with few scenarios (the homepage has one) get more reruns each, so their
+    # percentiles rest on as many samples as the chart page's
+    per_page = {}
+    for page, _, _ in selected:
+        per_page[page] = per_page.get(page, 0) + 1
+    sessions = {}
+    results = {}
+    for page, name, apply_state in selected:
+        at = sessions.get(page)
+        if at is None:
+            at = sessions[page] = AppTest.from_file(os.path.join(ROOT, page), default_timeout=TIMEOUT).run()
+
+        start = time.perf_counter()
+        apply_state(at)
+        first_ms = (time.perf_counter() - start) * 1000
+        if at.exception:
+            raise RuntimeError(f"{name}: {[e.value for e in at.exception]}")
+
+        # Like timeit: no garbage collection pauses inside the timed reruns
+        samples, cold = [], []
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(max(repeat, -(-MIN_PAGE_SAMPLES // per_page[page]))):
+                samples.append(timed_run(at))
+            for _ in range(max(cold_repeat, 1)):
+                clear_state_caches()
+                cold.append(timed_run(at))
+        finally:
+            gc.enable()
+
+        # Peak memory of one extra warm and one extra cold rerun, kept out of the timings
+        warm_peak = peak_kb(at)
+        clear_state_caches()
+        cold_peak = peak_kb(at)
+
+        results[name] = {
+            "first_ms": round(first_ms, 2),
+            "p50_ms": round(statistics.median(samples), 2),
+            "p95_ms": round(percentile(samples, 0.95), 2),
+            "cold_ms": round(min(cold), 2),  # like timeit: the least disturbed of a few reruns
+            "peak_kb": warm_peak,
+            "cold_peak_kb": cold_peak,
+        }
+        print(f"{name:<60} p50 {results[name]['p50_ms']:8.2f} ms  p95 {results[name]['p95_ms']:8.2f} ms  "
+              f"cold {results[name]['cold_ms']:8.2f} ms  peak {warm_peak:9.1f} / {cold_peak:9.1f} KB", flush=True)
+    return results
+
+
+# ==== Baseline comparison ====
+# Latency is gated per view, so a slowdown confined to one tab or one chart variable fails
+# the run: a chart view (a Demographics variable or the Job Offers tab) is held to the
+# median of its scenarios over every filter state, the other pages' scenarios are views of
+# their own. Single chart scenarios drift by a third or more between runs on a shared
+# machine; the median over a view's 72 states does not. Warm p50 and the cold rerun each
+# get the threshold plus a small absolute slack; a failing view's scenarios are timed
+# again (RETIME_ROUNDS times at most, in a fresh session) and each metric keeps its best
+# value before it counts as a regression. Peak memory does not drift and is gated per
+# scenario. p95 rests on a handful of reruns per scenario; a slower one is listed only.
+SLACK_MS = 2.0
+SLACK_KB = 256.0
+RETIME_ROUNDS = 2
+
+
+def view_of(name):
+    return "chart/" + name.rsplit("/", 1)[1] if name.startswith("chart/") else name
+
+
+def compare(results, baseline, threshold):
+    # Returns (regressions, warnings) as lists of (scenario names, message)
+    regressions, warnings = [], []
+    views = {}
+    for name in results:
+        if name in baseline:
+            views.setdefault(view_of(name), []).append(name)
+    for view, names in views.items():
+        for metric in ("p50_ms", "p95_ms", "cold_ms"):
+            value = statistics.median(results[name][metric] for name in names)
+            base = statistics.median(baseline[name][metric] for name in names)
+            limit = base * (1 + threshold) + SLACK_MS
+            if value > limit:
+                line = f"{view}: {metric} {value:.2f} > {limit:.2f} (baseline {base:.2f}"
+                line += f", median of {len(names)} scenarios)" if len(names) > 1 else ")"
+                (warnings if metric == "p95_ms" else regressions).append((names, line))
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in ("peak_kb", "cold_peak_kb"):
+            limit = base[metric] * (1 + threshold) + SLACK_KB
+            if result[metric] > limit:
+                regressions.append(
+                    ([name], f"{name}: {metric} {result[metric]:.1f} > {limit:.1f} (baseline {base[metric]:.1f})"))
+    return regressions, warnings
+
+
+def median_of_rounds(rounds):
+    # The baseline is a typical measurement, not one round that ran in a quiet spell
+    return {
+        name: {metric: round(statistics.median(r[name][metric] for r in rounds), 2) for metric in result}
+        for name, result in rounds[0].items()
+    }
+
+
+def retime(results, names, repeat, cold_repeat):
+    # Best of the earlier and the new measurement, metric by metric
+    print(f"\nTiming {len(names)} failing scenarios again", flush=True)
+    for name, again in run_benchmarks(repeat, cold_repeat, names=names).items():
+        results[name] = {metric: min(value, again[metric]) for metric, value in results[name].items()}
+
+
+def summarize(results):
+    p95 = [r["p95_ms"] for r in results.values()]
+    cold = [r["cold_ms"] for r in results.values()]
+    peak = [max(r["peak_kb"], r["cold_peak_kb"]) for r in results.values()]
+    print(f"\n{len(results)} scenarios · median p95 {statistics.median(p95):.2f} ms · "
+          f"worst p95 {max(p95):.2f} ms · median cold {statistics.median(cold):.2f} ms · "
+          f"worst cold {max(cold):.2f} ms · worst peak {max(peak):.1f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless rerun benchmarks for every page (Streamlit AppTest).")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="timed reruns per scenario (more on pages with few scenarios)")
+    parser.add_argument("--cold-repeat", type=int, default=5,
+                        help="cold reruns per scenario, each after emptying the state-keyed caches")
+    parser.add_argument("--only", help="run only scenarios whose name contains this text")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown or memory growth over the baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--baseline-rounds", type=int, default=3,
+                        help="with --save-baseline: full rounds whose per-metric median is stored")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.repeat, args.cold_repeat, args.only)
+    if args.save_baseline and args.baseline_rounds > 1:
+        rounds = [results]
+        for n in range(2, args.baseline_rounds + 1):
+            print(f"\nRound {n} of {args.baseline_rounds}", flush=True)
+            rounds.append(run_benchmarks(args.repeat, args.cold_repeat, args.only))
+        results = median_of_rounds(rounds)
+    summarize(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.save_baseline:
+        baseline = {}
+        if args.only and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)  # keep the scenarios that were not rerun
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        sys.exit(0)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions, warnings = compare(results, baseline, args.threshold)
+    for _ in range(RETIME_ROUNDS):
+        if not regressions:
+            break
+        retime(results, {name for names, _ in regressions for name in names}, args.repeat, args.cold_repeat)
+        regressions, warnings = compare(results, baseline, args.threshold)
+    for _, line in warnings:
+        print("slower", line)
+    for _, line in regressions:
+        print("REGRESSION", line)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,90 @@
+import argparse
+import math
+import os
+import sys
+
+# Modules are imported and files opened relative to the repo root (as in bench_app.py)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from chart_data import GROUP_COLUMNS, compute_demographics_data, compute_job_offers_data  # noqa: E402
+from cube import get_cube  # noqa: E402
+from data_loader import dataset_version, load_data  # noqa: E402
+from precompute import enumerate_states  # noqa: E402
+
+# Sums and KDE curves differ between the backends only by floating-point rounding
+RTOL = 1e-6
+ATOL = 1e-9
+
+
+# ==== Differences between two chart-data values, as "path: reason" lines ====
+def differences(pandas_value, sql_value, path="data"):
+    if isinstance(pandas_value, dict) and isinstance(sql_value, dict):
+        if set(pandas_value) != set(sql_value):
+            return [f"{path}: keys {sorted(map(str, pandas_value))} != {sorted(map(str, sql_value))}"]
+        return [line for key in pandas_value
+                for line in differences(pandas_value[key], sql_value[key], f"{path}[{key!r}]")]
+    if isinstance(pandas_value, (pd.DataFrame, pd.Series)):
+        check = pd.testing.assert_frame_equal if isinstance(pandas_value, pd.DataFrame) else pd.testing.assert_series_equal
+        try:
+            check(pandas_value, sql_value, check_dtype=False, check_names=False, check_index_type=False,
+                  check_categorical=False, rtol=RTOL, atol=ATOL)
+        except (AssertionError, TypeError) as err:
+            return [f"{path}: {str(err).splitlines()[0]}"]
+        return []
+    if isinstance(pandas_value, np.ndarray) or isinstance(sql_value, np.ndarray):
+        a, b = np.asarray(pandas_value, dtype=float), np.asarray(sql_value, dtype=float)
+        if a.shape != b.shape or not np.allclose(a, b, rtol=RTOL, atol=ATOL, equal_nan=True):
+            return [f"{path}: arrays differ"]
+        return []
+    if isinstance(pandas_value, float) or isinstance(sql_value, float):
+        if pandas_value is None or sql_value is None:
+            return [] if pandas_value is sql_value else [f"{path}: {pandas_value!r} != {sql_value!r}"]
+        if math.isnan(pandas_value) and math.isnan(sql_value):
+            return []
+        if not math.isclose(pandas_value, sql_value, rel_tol=RTOL, abs_tol=ATOL):
+            return [f"{path}: {pandas_value!r} != {sql_value!r}"]
+        return []
+    if pandas_value != sql_value:
+        return [f"{path}: {pandas_value!r} != {sql_value!r}"]
+    return []
+
+
+# ==== Every selected filter state through both backends ====
+def check(states, cube, version):
+    failures = []
+    for state in states:
+        results = [(f"demographics/{group_col}",
+                    compute_demographics_data(cube, state, group_col, "pandas"),
+                    compute_demographics_data(cube, state, group_col, "sql"))
+                   for group_col in GROUP_COLUMNS]
+        results.append(("job_offers",
+                        compute_job_offers_data(cube, version, state, "pandas"),
+                        compute_job_offers_data(cube, version, state, "sql")))
+        for name, pandas_value, sql_value in results:
+            failures += [f"{state} {line}" for line in differences(pandas_value, sql_value, name)]
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the pandas and SQL backends give identical chart data.")
+    parser.add_argument("--levels", nargs="+", help="job levels (default: all)")
+    parser.add_argument("--no-gender-subsets", action="store_true",
+                        help="only 'all genders' instead of every gender subset")
+    parser.add_argument("--ages", nargs="+", default=["full", "18-22", "22-26", "25-29"],
+                        help="'all' age ranges, 'full' only, or ranges like 18-29 22-26")
+    args = parser.parse_args()
+
+    version = dataset_version()
+    cube = get_cube(load_data(), version)
+    states = list(enumerate_states(cube, args.levels, not args.no_gender_subsets, args.ages))
+
+    failures = check(states, cube, version)
+    for line in failures[:50]:
+        print(line)
+    print(f"{len(states):,} filter states: {len(failures):,} differences")
+    sys.exit(1 if failures else 0)
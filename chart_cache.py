@@ -0,0 +1,134 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from result_store import open_result_store
+
+# ==== Size budget for chart-ready results (per server process) ====
+CHART_CACHE_MB = int(os.environ.get("ECS_CHART_CACHE_MB", "64"))
+
+
+def estimate_size(value):
+    # Approximate bytes held by a cached value
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "to_plotly_json"):
+        return len(value.to_json(validate=False))  # plotly figures: size of their JSON
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# ==== Bounded LRU cache, evicting least recently used entries by total size ====
+class LRUCache:
+    def __init__(self, max_bytes, shared=None):
+        self.max_bytes = max_bytes
+        self.shared = shared  # optional ResultStore consulted on a miss (see result_store.py)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key):
+        # A peek: neither counted as a lookup nor marked as recently used
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value  # never fits; hand it back without caching
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute, counts=None):
+        # counts: optional dict of this caller's own hits / misses / shared_hits (the
+        # counters above are process-wide and include every other session's lookups)
+        missing = object()
+        value = self.get(key, missing)
+        outcome = "hits"
+        if value is missing:
+            outcome = "misses"
+            if self.shared is not None:
+                value = self.shared.get(key, missing)
+            if value is missing:
+                value = compute()
+                if self.shared is not None:
+                    self.shared.put(key, value)
+            else:
+                self.shared_hits += 1
+                if counts is not None:
+                    counts["shared_hits"] += 1
+            value = self.put(key, value)
+        if counts is not None:
+            counts[outcome] += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def entry_sizes(self):
+        # (key, bytes) from least to most recently used
+        with self._lock:
+            return [(key, size) for key, (_, size) in self._entries.items()]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_hits": self.shared_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+@st.cache_resource
+def get_chart_cache():
+    return LRUCache(CHART_CACHE_MB * 2**20, shared=open_result_store())
+
+
+# ==== Canonical filter state used as cache key ====
+def filter_state(genders, level, age_range, statuses):
+    return (
+        tuple(sorted(genders)) if genders else None,
+        level,
+        (int(age_range[0]), int(age_range[1])),
+        tuple(sorted(statuses)),
+    )
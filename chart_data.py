@@ -0,0 +1,240 @@
+import os
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from chart_cache import get_chart_cache
+from cube import (get_cube, select_for_filters, median_age, share, category_counts, age_counts_by,
+                  entrepreneurship_share_by_level, average_offers)
+from data_loader import DATA_FILE, load_data
+from kde import age_density_curves
+from parallel import get_executor, run_all, shares_memory, submit
+from profiling import cache_counts, span
+from result_store import code_version
+
+GROUP_COLUMNS = ["Gender", "Field_of_Study"]  # the Demographics tab's chart_option values
+
+# ==== Chart-ready data for the Demographics tab ====
+# Once the slice is cut, the KPIs, the donut and the density curves are independent, so
+# they run side by side on the worker pool (parallel.py)
+def _demographics_kpis(sub):
+    return {
+        "total": int(sub.counts.sum()),
+        "median_age": median_age(sub),
+        "pct_female": share(sub, "Gender", "Female") * 100,
+        "top_fields": category_counts(sub, "Field_of_Study").head(3).index.tolist(),
+    }
+
+
+def _density_curves(sub, group_col, x_vals):
+    age_counts = age_counts_by(sub, group_col)
+    with span("kde"):
+        return age_density_curves(sub.labels["Age"], age_counts, x_vals)
+
+
+def demographics_data(cube, state, group_col):
+    genders, level, age_range, statuses = state
+    with span("filter"):
+        sub = select_for_filters(cube, genders, level, age_range, statuses)
+    x_vals = np.linspace(age_range[0], age_range[1], 100)
+    with span("aggregates"):
+        kpis, donut, curves = run_all(
+            (_demographics_kpis, sub),
+            (category_counts, sub, group_col),
+            (_density_curves, sub, group_col, x_vals),
+        )
+    return {**kpis, "x_vals": x_vals, "donut": donut, "curves": curves}
+
+
+# ==== Chart-ready data for the Job Offers tab ====
+def job_offers_data(cube, version, state):
+    genders, level, age_range, statuses = state
+    with span("filter"):
+        sub = select_for_filters(cube, genders, level, age_range, statuses)
+    total = int(sub.counts.sum())
+
+    with span("aggregates"):
+        # The line goes to the pool; the bar is a slice of a per-dataset table, cut here meanwhile
+        line = submit(average_offers, sub)
+        df_level = entrepreneurship_share_by_level(cube, version).get(level)
+        if df_level is None or total == 0:
+            df_bar = None
+        else:
+            df_bar = df_level[
+                (df_level["Age"].between(age_range[0], age_range[1])) &
+                (df_level["Entrepreneurship"].isin(statuses))
+            ].reset_index(drop=True)
+
+        return {
+            "total": total,
+            "median_age": median_age(sub),
+            "pct_entrepreneurs": share(sub, "Entrepreneurship", "Yes") * 100,
+            "bar": df_bar,
+            "line": line.result(),
+        }
+
+
+# ==== Backend that computes a missing result ====
+# "pandas": slices of the in-memory cube; "sql": DuckDB queries on the columnar store
+# (sql_backend.py). ECS_CHART_BACKEND sets the default, ?backend=sql switches one session.
+# The backend is part of every cache key, so each one computes its own results instead of
+# serving the other's; the precomputed artifact only holds pandas results.
+CHART_BACKEND = os.environ.get("ECS_CHART_BACKEND", "pandas")
+BACKENDS = ["pandas", "sql"]
+
+
+def chart_backend():
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return CHART_BACKEND  # no session (warm-up thread, command line): no query params
+    backend = st.query_params.get("backend")
+    return backend if backend in BACKENDS else CHART_BACKEND
+
+
+def compute_demographics_data(cube, state, group_col, backend):
+    if backend == "sql":
+        import sql_backend  # duckdb is only needed when this backend is used
+        return sql_backend.demographics_data(state, group_col)
+    return demographics_data(cube, state, group_col)
+
+
+def compute_job_offers_data(cube, version, state, backend):
+    if backend == "sql":
+        import sql_backend
+        return sql_backend.job_offers_data(state)
+    return job_offers_data(cube, version, state)
+
+
+# ==== Precomputed results (written by precompute.py), loaded once per process ====
+PRECOMPUTED_FILE = os.environ.get("ECS_PRECOMPUTED", os.path.splitext(DATA_FILE)[0] + ".charts.pkl")
+PRECOMPUTED_FORMAT = 2
+
+
+@st.cache_resource(max_entries=2)
+def _load_precomputed(path, mtime_ns):
+    with open(path, "rb") as f:
+        artifact = pickle.load(f)
+    # Results from other chart code are ignored rather than served stale
+    if artifact.get("format") != PRECOMPUTED_FORMAT or artifact.get("code_version") != code_version():
+        return None, {}
+    return artifact["dataset_version"], artifact["results"]
+
+
+def unpack(value):
+    # Inverse of precompute.pack
+    if isinstance(value, dict):
+        return {k: unpack(v) for k, v in value.items()}
+    if isinstance(value, tuple) and value and value[0] == "frame":
+        return pd.DataFrame({
+            col: np.asarray(data[1], dtype=object)[data[2]] if isinstance(data, tuple) else data
+            for col, data in value[1].items()
+        })
+    if isinstance(value, tuple) and value and value[0] == "series":
+        _, index, values, name = value
+        return pd.Series(values, index=index, name=name)
+    return value
+
+
+def precomputed(version):
+    try:
+        mtime = os.stat(PRECOMPUTED_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    artifact_version, results = _load_precomputed(PRECOMPUTED_FILE, mtime)
+    return results if artifact_version == version else {}
+
+
+# ==== Speculative prefetch of the views not on screen (opt-in) ====
+# ECS_PREFETCH=1: once the open tab is drawn, the chart data of the other tab and of the
+# other Demographics variable is computed on the worker pool in the background, so
+# switching to them is a cache hit. Off by default, since it about triples the work (and
+# SQL queries) of every filter change for views that may never be opened.
+PREFETCH = os.environ.get("ECS_PREFETCH", "") == "1"
+
+_in_flight = {}  # chart cache key -> Future of its background computation
+_in_flight_lock = threading.Lock()
+
+
+def _key(backend, version, state, group_col):
+    if group_col is None:
+        return ("job_offers", backend, version, state)
+    return ("demographics", backend, version, state, group_col)
+
+
+def _compute(version, state, group_col, backend, cube=None):
+    # group_col None: the Job Offers data
+    if cube is None:
+        cube = get_cube(load_data(), version)  # process pool: the worker's own cube, built once
+    if group_col is None:
+        return compute_job_offers_data(cube, version, state, backend)
+    return compute_demographics_data(cube, state, group_col, backend)
+
+
+def _fill_cache(cache, key):
+    def done(future):
+        if future.exception() is None:
+            if cache.shared is not None:
+                cache.shared.put(key, future.result())
+            cache.put(key, future.result())
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+    return done
+
+
+def prefetch_chart_data(cube, version, state, backend=None):
+    executor = get_executor()
+    if not PREFETCH or executor is None:
+        return  # without a pool, nothing could run in the background
+    backend = backend or chart_backend()
+    cache, ready, missing = get_chart_cache(), precomputed(version), object()
+    for group_col in [*GROUP_COLUMNS, None]:
+        key = _key(backend, version, state, group_col)
+        if key in ready or key in cache or key in _in_flight:
+            continue
+        if cache.shared is not None:
+            value = cache.shared.get(key, missing)
+            if value is not missing:
+                cache.put(key, value)
+                continue
+        # One task per view: its pieces run inline on that worker, leaving the other
+        # workers to the open tab's next rerun
+        future = executor.submit(_compute, version, state, group_col, backend,
+                                 cube if shares_memory() else None)
+        with _in_flight_lock:
+            _in_flight[key] = future
+        future.add_done_callback(_fill_cache(cache, key))
+
+
+# ==== Cached entry points used by the chart page ====
+# Precomputed artifact first (a dict lookup), then the chart cache, then a background
+# computation already under way (prefetch_chart_data) or the backend. backend defaults to
+# this session's (chart_backend).
+def _cached(cube, version, state, group_col, backend):
+    backend = backend or chart_backend()
+    key = _key(backend, version, state, group_col)
+    packed = precomputed(version).get(key)
+    if packed is not None:
+        return unpack(packed)
+    cache, counts = get_chart_cache(), cache_counts()
+    future = _in_flight.get(key)
+    if future is not None and key not in cache:
+        # Its done-callback also stores it (and in the shared store), but may not have run
+        # yet when result() returns; the figures built next must find it in the cache
+        value = cache.put(key, future.result())
+        if counts is not None:
+            counts["misses"] += 1
+        return value
+    return cache.get_or_compute(key, lambda: _compute(version, state, group_col, backend, cube), counts)
+
+
+def cached_demographics_data(cube, version, state, group_col, backend=None):
+    with span("demographics_data"):
+        return _cached(cube, version, state, group_col, backend)
+
+
+def cached_job_offers_data(cube, version, state, backend=None):
+    with span("job_offers_data"):
+        return _cached(cube, version, state, None, backend)
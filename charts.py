@@ -0,0 +1,231 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from chart_cache import get_chart_cache
+from chart_data import cached_demographics_data, cached_job_offers_data, chart_backend
+from profiling import cache_counts, span
+
+color_map = {'Yes': '#FFD700', 'No': '#004080'}
+
+# Set on every figure: Streamlit's theme fills in its own background otherwise
+transparent = dict(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+
+
+# ==== One shared, compact layout template ====
+# Streamlit's default Plotly template styles every trace type plotly knows about and is
+# sent with every figure. This one keeps its theme layout plus the three trace types we
+# draw, and adds the styling all of our charts share.
+_template = None
+
+
+def chart_template():
+    global _template
+    if _template is None:
+        base = pio.templates[pio.templates.default]
+        _template = go.layout.Template(
+            layout=base.layout,
+            data={kind: base.data[kind] for kind in ("scatter", "bar", "pie") if base.data[kind]},
+        )
+        _template.layout.update(legend=dict(orientation='h', yanchor='bottom', xanchor='center', x=0.5))
+    return _template
+
+
+# Coordinates go out as float32 typed arrays (base64 in the figure JSON) instead of float64
+def compact(values):
+    return np.asarray(values, dtype=np.float32)
+
+
+# ==== Demographics tab ====
+def density_figure(demo, group_col):
+    fig_density = go.Figure(layout=dict(template=chart_template()))
+    x_vals = compact(demo["x_vals"])
+
+    for cat, y_vals in demo["curves"].items():
+        fig_density.add_trace(go.Scatter(
+            x=x_vals,
+            y=compact(y_vals),
+            mode='lines',
+            name=str(cat),
+            fill='tozeroy'
+        ))
+
+    fig_density.update_layout(
+        **transparent,
+        title=f"Age Distribution by {group_col.replace('_', ' ')}",
+        xaxis_title="Age",
+        yaxis_title="Density",
+        height=500,
+        margin=dict(t=40, l=40, r=40, b=80),
+        legend=dict(y=-0.35)
+    )
+    return fig_density
+
+
+def donut_figure(demo, group_col):
+    pie_data = demo["donut"]
+
+    fig_donut = go.Figure(
+        data=[
+            go.Pie(
+                labels=pie_data.index.tolist(),
+                values=pie_data.to_numpy().astype(np.int32),
+                hole=0.5,
+                textinfo='percent+label',
+                insidetextorientation='radial',
+                marker=dict(line=dict(color='#fff', width=1))
+            )
+        ],
+        layout=dict(template=chart_template()),
+    )
+
+    fig_donut.update_layout(
+        **transparent,
+        title={
+            'text': f"{group_col.replace('_', ' ')} Distribution (Donut Chart)",
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': dict(size=18, color='#333')
+        },
+        legend=dict(y=-0.3, font=dict(size=12)),
+        height=500,
+        margin=dict(t=40, l=20, r=20, b=80),
+    )
+    return fig_donut
+
+
+# ==== Job Offers tab ====
+def bar_figure(offers, level):
+    df_bar = offers["bar"].astype({'Age': np.int8, 'Percentage': np.float32})
+    even_ages = [age for age in sorted(df_bar['Age'].unique()) if age % 2 == 0]
+
+    fig_bar = px.bar(
+        df_bar,
+        x='Age',
+        y='Percentage',
+        color='Entrepreneurship',
+        barmode='stack',
+        color_discrete_map=color_map,
+        category_orders={'Entrepreneurship': ['No', 'Yes']},
+        labels={'Age': 'Age', 'Percentage': 'Percentage'},
+        height=450,
+        width=1250,
+        template=chart_template(),
+        title=f"Entrepreneurship Distribution by Age – {level} Level"
+    )
+
+    fig_bar.update_traces(
+        hovertemplate="Entrepreneurship=%{customdata[0]}<br>Age=%{x}<br>Percentage=%{y:.0%}<extra></extra>",
+        customdata=df_bar[['Entrepreneurship']].values,
+        hoverinfo="skip"
+    )
+
+    fig_bar.update_layout(
+        **transparent,
+        margin=dict(t=40, l=40, r=40, b=40),
+        legend_title_text='Entrepreneurship',
+        xaxis_tickangle=0,
+        bargap=0.1,
+        xaxis=dict(tickvals=even_ages),
+        yaxis=dict(title="Percentage", range=[0, 1], tickformat=".0%"),
+        legend=dict(y=-0.3)
+    )
+    return fig_bar
+
+
+def line_figure(offers, level, statuses):
+    df_avg_offers = offers["line"]
+    even_ages = [age for age in sorted(offers["bar"]['Age'].unique()) if age % 2 == 0]
+
+    fig_line = go.Figure(layout=dict(template=chart_template()))
+    for status in statuses:
+        data_status = df_avg_offers[df_avg_offers["Entrepreneurship"] == status]
+        fig_line.add_trace(go.Scatter(
+            x=data_status["Age"].to_numpy().astype(np.int8),
+            y=compact(data_status["Job_Offers"]),
+            mode="lines+markers",
+            name=status,
+            line=dict(color=color_map[status], width=2),
+            marker=dict(size=6),
+            hovertemplate="%{y:.2f}"
+        ))
+
+    fig_line.update_layout(
+        **transparent,
+        title=f"Average Job Offers by Age – {level} Level",
+        margin=dict(t=40, l=40, r=40, b=40),
+        legend_title_text='Entrepreneurship',
+        xaxis_tickangle=0,
+        hovermode="x unified",
+        width=1250,
+        xaxis=dict(
+            showspikes=True,
+            spikemode='across',
+            spikesnap='cursor',
+            spikethickness=1.2,
+            spikedash='dot',
+            tickvals=even_ages
+        ),
+        yaxis=dict(
+            title="Average Job Offers",
+            showspikes=True,
+            spikemode='across',
+            spikesnap='cursor',
+            spikethickness=1.2,
+            spikedash='dot',
+            gridcolor='#b4adae'
+        ),
+        legend=dict(y=-0.3)
+    )
+    return fig_line
+
+
+# ==== Finished figures with their serialized spec ====
+# st.plotly_chart (and to_json, which estimate_size uses) read a figure through to_dict(),
+# a deep copy that is most of its per-rerun cost. A cached figure is never changed again,
+# so its spec is built once and handed out as is; only the JSON encoding remains.
+class SpecFigure(go.Figure):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._spec = super().to_dict()
+
+    def to_dict(self):
+        spec = self.__dict__.get("_spec")
+        return super().to_dict() if spec is None else spec  # None while plotly builds it
+
+    def __reduce__(self):
+        # go.Figure's version adds keys to the dict from to_dict(), i.e. to the shared spec
+        return (self.__class__, (dict(self._spec),))
+
+
+def freeze(figures):
+    return tuple(SpecFigure(fig) for fig in figures)
+
+
+# ==== Figures memoized by filter state (same LRU as the chart data) ====
+# Building a figure is pure Python, so a pool would only add overhead; the pieces of the
+# chart data they need are what runs concurrently (chart_data.demographics_data)
+def demographics_figures(cube, version, state, group_col, backend=None):
+    backend = backend or chart_backend()
+
+    def build():
+        demo = cached_demographics_data(cube, version, state, group_col, backend)
+        return freeze((density_figure(demo, group_col), donut_figure(demo, group_col)))
+
+    key = ("demographics_figures", backend, version, state, group_col)
+    with span("demographics_figures"):
+        return get_chart_cache().get_or_compute(key, build, cache_counts())
+
+
+def job_offers_figures(cube, version, state, statuses, backend=None):
+    backend = backend or chart_backend()
+
+    def build():
+        offers = cached_job_offers_data(cube, version, state, backend)
+        level = state[1]
+        return freeze((bar_figure(offers, level), line_figure(offers, level, statuses)))
+
+    key = ("job_offers_figures", backend, version, state, tuple(statuses))
+    with span("job_offers_figures"):
+        return get_chart_cache().get_or_compute(key, build, cache_counts())
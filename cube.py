@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_loader import CATEGORIES, NUMERIC_SCHEMA
+
+# ==== Cube dimensions: everything the chart page filters or groups by ====
+DIMENSIONS = ["Current_Job_Level", "Age", "Gender", "Entrepreneurship", "Field_of_Study"]
+AGES = list(range(NUMERIC_SCHEMA["Age"][1], NUMERIC_SCHEMA["Age"][2] + 1))
+
+
+# ==== Dense cube of row counts and Job_Offers sums (4 x 13 x 3 x 2 x 7 cells) ====
+class Cube:
+    def __init__(self, counts, offers, labels):
+        self.counts = counts  # rows per cell
+        self.offers = offers  # sum of Job_Offers per cell
+        self.labels = labels  # dimension -> labels along its axis
+
+    @classmethod
+    def from_frame(cls, df):
+        labels = {dim: AGES if dim == "Age" else CATEGORIES[dim] for dim in DIMENSIONS}
+        shape = tuple(len(labels[dim]) for dim in DIMENSIONS)
+
+        # Flat cell number built one dimension at a time to keep temporaries small
+        cell = np.zeros(len(df), dtype=np.int32)
+        valid = np.ones(len(df), dtype=bool)
+        for dim, size in zip(DIMENSIONS, shape):
+            if dim == "Age":
+                codes = df["Age"].to_numpy().astype(np.int32) - AGES[0]
+            else:
+                codes = df[dim].cat.codes.to_numpy().astype(np.int32)
+            valid &= codes >= 0  # missing categories are left out
+            cell = cell * size + codes
+
+        cell = cell[valid]
+        counts = np.bincount(cell, minlength=int(np.prod(shape))).reshape(shape)
+        offers = np.bincount(
+            cell, weights=df["Job_Offers"].to_numpy()[valid], minlength=counts.size
+        ).reshape(shape)
+        return cls(counts, offers, labels)
+
+    def select(self, **filters):
+        # filters: dimension -> labels to keep; missing or None keeps the whole axis
+        counts, offers, labels = self.counts, self.offers, dict(self.labels)
+        for axis, dim in enumerate(DIMENSIONS):
+            keep = filters.get(dim)
+            if keep is None:
+                continue
+            idx = [i for i, label in enumerate(self.labels[dim]) if label in keep]
+            counts = np.take(counts, idx, axis=axis)
+            offers = np.take(offers, idx, axis=axis)
+            labels[dim] = [self.labels[dim][i] for i in idx]
+        return Cube(counts, offers, labels)
+
+    def margin(self, *dims, values="counts"):
+        # Sum out every other dimension; kept axes stay in DIMENSIONS order
+        data = self.counts if values == "counts" else self.offers
+        axes = tuple(i for i, dim in enumerate(DIMENSIONS) if dim not in dims)
+        return data.sum(axis=axes)
+
+    def present(self, dim):
+        # Labels of a dimension that have at least one row
+        return [label for label, n in zip(self.labels[dim], self.margin(dim)) if n > 0]
+
+
+@st.cache_resource(max_entries=4)
+def get_cube(_df, version):
+    return Cube.from_frame(_df)
+
+
+# ==== Chart page slice ====
+def select_for_filters(cube, genders, level, age_range, statuses):
+    ages = [age for age in cube.labels["Age"] if age_range[0] <= age <= age_range[1]]
+    return cube.select(
+        Gender=genders, Current_Job_Level=[level], Age=ages, Entrepreneurship=statuses
+    )
+
+
+# ==== Values derived from cube slices ====
+def median_age(sub):
+    age_counts = sub.margin("Age")
+    n = int(age_counts.sum())
+    if n == 0:
+        return float("nan")
+    # Same as pandas median: middle value, or the mean of the two middle values
+    cum = np.cumsum(age_counts)
+    ages = sub.labels["Age"]
+    low = ages[np.searchsorted(cum, (n - 1) // 2, side="right")]
+    high = ages[np.searchsorted(cum, n // 2, side="right")]
+    return (low + high) / 2
+
+
+def share(sub, dim, label):
+    total = sub.counts.sum()
+    if total == 0 or label not in sub.labels[dim]:
+        return 0.0
+    return float(sub.margin(dim)[sub.labels[dim].index(label)] / total)
+
+
+def category_counts(sub, dim):
+    # Like value_counts(): non-empty categories, largest first
+    counts = pd.Series(sub.margin(dim), index=sub.labels[dim], name="Count")
+    return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+
+def age_counts_by(sub, dim):
+    # category -> row count per age, for the categories present in the slice
+    matrix = sub.margin("Age", dim)  # (ages, categories)
+    return {
+        label: matrix[:, i] for i, label in enumerate(sub.labels[dim]) if matrix[:, i].sum() > 0
+    }
+
+
+def entrepreneurship_share(cube):
+    counts = cube.margin("Current_Job_Level", "Age", "Entrepreneurship")
+    totals = counts.sum(axis=2, keepdims=True)
+    percentage = np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+    index = pd.MultiIndex.from_product(
+        [cube.labels["Current_Job_Level"], cube.labels["Age"], cube.labels["Entrepreneurship"]],
+        names=["Current_Job_Level", "Age", "Entrepreneurship"],
+    )
+    df_grouped = pd.DataFrame(
+        {"Count": counts.ravel(), "Percentage": percentage.ravel()}, index=index
+    ).reset_index()
+    return df_grouped[df_grouped["Count"] > 0].reset_index(drop=True)
+
+
+# Only changes with the data: computed once per dataset version and split by job level,
+# so a stacked-bar update is a dict lookup plus an age/status slice
+@st.cache_resource(max_entries=4)
+def entrepreneurship_share_by_level(_cube, version):
+    df_grouped = entrepreneurship_share(_cube)
+    return {
+        level: part.reset_index(drop=True)
+        for level, part in df_grouped.groupby("Current_Job_Level", sort=False)
+    }
+
+
+def average_offers(sub):
+    counts = sub.margin("Age", "Entrepreneurship")
+    offers = sub.margin("Age", "Entrepreneurship", values="offers")
+    index = pd.MultiIndex.from_product(
+        [sub.labels["Age"], sub.labels["Entrepreneurship"]], names=["Age", "Entrepreneurship"]
+    )
+    df_avg = pd.DataFrame({"Count": counts.ravel(), "Offers": offers.ravel()}, index=index)
+    df_avg = df_avg[df_avg["Count"] > 0]
+    df_avg["Job_Offers"] = df_avg["Offers"] / df_avg["Count"]
+    return df_avg[["Job_Offers"]].reset_index()
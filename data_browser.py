@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import streamlit as st
+
+from chart_cache import LRUCache
+from filter_index import get_filter_index
+from profiling import span
+
+PAGE_SIZES = [25, 50, 100, 250]
+# Row positions of recent browser queries and sort orders, shared by all sessions (per server process)
+BROWSER_CACHE_MB = int(os.environ.get("ECS_BROWSER_CACHE_MB", "32"))
+FILTER_COLUMNS = ["Gender", "Field_of_Study", "Current_Job_Level", "Entrepreneurship"]
+
+
+# ==== Server-side sort, filter and search (the full frame never leaves the server) ====
+def _positions(rows, num_rows):
+    # int32 halves the memory of every cached position array up to 2**31 rows
+    return rows.astype(np.int32 if num_rows < 2**31 else np.int64)
+
+
+# One position per row: kept in the row cache below, so sort orders count against its bytes
+def _sort_order(df, version, column, ascending):
+    def compute():
+        values = df[column].reset_index(drop=True)
+        order = _positions(values.sort_values(ascending=ascending, kind="stable").index.to_numpy(), len(df))
+        order.setflags(write=False)
+        return order
+
+    return get_row_cache().get_or_compute(("sort_order", version, column, ascending), compute)
+
+
+def _search_mask(df, search):
+    # A copy: pandas may hand back a read-only view, which cannot be OR-ed in place
+    mask = df["Student_ID"].str.contains(search, case=False, regex=False).to_numpy(dtype=bool, copy=True)
+    for col in FILTER_COLUMNS:
+        matches = [cat for cat in df[col].cat.categories if search.lower() in cat.lower()]
+        if matches:
+            mask |= df[col].isin(matches).to_numpy()
+    return mask
+
+
+def _browse_rows(df, version, filters, age_range, search, sort_column, ascending):
+    index = get_filter_index(df, version)
+    mask = index.between("Age", *age_range)
+    for col, values in filters:
+        if values is not None:
+            mask &= index.any_of(col, values)
+    selected = np.unpackbits(mask, count=index.num_rows).astype(bool)
+    if search:
+        selected &= _search_mask(df, search)
+
+    if sort_column is None:
+        rows = _positions(np.flatnonzero(selected), index.num_rows)
+    else:
+        order = _sort_order(df, version, sort_column, ascending)
+        rows = order[selected[order]]
+    rows.setflags(write=False)  # shared by every session that asks for the same rows
+    return rows
+
+
+# Held by reference (no pickled copy per rerun) and bounded by bytes, not entry count
+@st.cache_resource
+def get_row_cache():
+    return LRUCache(BROWSER_CACHE_MB * 2**20)
+
+
+def browse_rows(df, version, filters, age_range, search, sort_column, ascending):
+    # filters: tuple of (column, selected values or None for all) pairs; returns row positions
+    # in display order
+    key = ("browse_rows", version, filters, age_range, search, sort_column, ascending)
+    return get_row_cache().get_or_compute(
+        key, lambda: _browse_rows(df, version, filters, age_range, search, sort_column, ascending)
+    )
+
+
+# ==== Paginated browser widget ====
+def render_data_browser(df, version, key="browser"):
+    with st.expander("🔎 Filter rows"):
+        filter_cols = st.columns(len(FILTER_COLUMNS))
+        filters = []
+        for col, container in zip(FILTER_COLUMNS, filter_cols):
+            options = list(df[col].cat.categories)
+            chosen = container.multiselect(col.replace("_", " "), options, default=options, key=f"{key}_{col}")
+            # Every option: no filter, so rows missing this column are shown too
+            filters.append((col, None if set(chosen) == set(options) else tuple(chosen)))
+        ages = get_filter_index(df, version).values("Age")
+        min_age, max_age = min(ages), max(ages)
+        age_range = st.slider("Age", min_value=min_age, max_value=max_age,
+                              value=(min_age, max_age), key=f"{key}_age")
+
+    search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+    search = search_col.text_input("Search (Student ID or category)", key=f"{key}_search").strip()
+    sort_column = sort_col.selectbox("Sort by", ["(none)"] + list(df.columns), key=f"{key}_sort")
+    ascending = order_col.radio("Order", ["Asc", "Desc"], horizontal=True, key=f"{key}_order") == "Asc"
+    page_size = size_col.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_size")
+
+    with span("browse_rows"):
+        rows = browse_rows(df, version, tuple(filters), age_range, search,
+                           None if sort_column == "(none)" else sort_column, ascending)
+
+    total_pages = max(1, -(-len(rows) // page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = 1  # filters shrank the result: back to the first page
+    page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages,
+                           step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    page_rows = rows[start:start + page_size]
+    with span("dataframe"):
+        st.dataframe(df.iloc[page_rows])
+    st.caption(f"Rows {start + 1 if len(page_rows) else 0}–{start + len(page_rows)} "
+               f"of {len(rows):,} matching ({len(df):,} total)")
@@ -0,0 +1,407 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from profiling import span
+
+try:
+    import fcntl
+except ImportError:  # Windows: builders are then only serialized within this process
+    fcntl = None
+
+# ==== Data source ====
+# ECS_DATA_FILE points the app at a larger .xlsx or .csv export
+DATA_FILE = os.environ.get("ECS_DATA_FILE", "education_career_success.xlsx")
+
+# ==== Compact schema ====
+# Bump when the schema changes so existing columnar stores get rebuilt
+SCHEMA_VERSION = "1"
+
+CATEGORIES = {
+    "Gender": ["Female", "Male", "Other"],
+    "Field_of_Study": ["Arts", "Business", "Computer Science", "Engineering", "Law", "Mathematics", "Medicine"],
+    "Current_Job_Level": ["Entry", "Executive", "Mid", "Senior"],
+    "Entrepreneurship": ["No", "Yes"],
+}
+
+# column -> (dtype, min, max); ranges follow the Variable Explanation tab,
+# the three columns not listed there are bounded by their survey scale
+NUMERIC_SCHEMA = {
+    "Age": ("int8", 18, 30),
+    "High_School_GPA": ("float32", 2.0, 4.0),
+    "SAT_Score": ("int16", 900, 1600),
+    "University_Ranking": ("int16", 1, 1000),
+    "University_GPA": ("float32", 2.0, 4.0),
+    "Internships_Completed": ("int8", 0, 4),
+    "Projects_Completed": ("int8", 0, 9),
+    "Certifications": ("int8", 0, 5),
+    "Soft_Skills_Score": ("int8", 1, 10),
+    "Networking_Score": ("int8", 1, 10),
+    "Job_Offers": ("int8", 0, 5),
+    "Starting_Salary": ("int32", 25000, 150000),
+    "Career_Satisfaction": ("int8", 1, 10),
+    "Years_to_Promotion": ("int8", 1, 5),
+    "Work_Life_Balance": ("int8", 1, 10),
+}
+
+COLUMNS = [
+    "Student_ID", "Age", "Gender", "High_School_GPA", "SAT_Score", "University_Ranking",
+    "University_GPA", "Field_of_Study", "Internships_Completed", "Projects_Completed",
+    "Certifications", "Soft_Skills_Score", "Networking_Score", "Job_Offers",
+    "Starting_Salary", "Career_Satisfaction", "Years_to_Promotion", "Current_Job_Level",
+    "Work_Life_Balance", "Entrepreneurship",
+]
+
+
+def validate_schema(df):
+    problems = []
+
+    missing = [col for col in COLUMNS if col not in df.columns]
+    if missing:
+        problems.append(f"missing columns: {', '.join(missing)}")
+
+    for col, (_, low, high) in NUMERIC_SCHEMA.items():
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce")
+        if values.isna().any():
+            problems.append(f"{col}: {int(values.isna().sum())} missing or non-numeric values")
+        out_of_range = values[(values < low) | (values > high)]
+        if not out_of_range.empty:
+            problems.append(f"{col}: {len(out_of_range)} values outside {low}–{high}")
+
+    for col, categories in CATEGORIES.items():
+        if col not in df.columns:
+            continue
+        unknown = sorted(set(df[col].dropna().unique()) - set(categories))
+        if unknown:
+            problems.append(f"{col}: unexpected values {unknown}")
+
+    if problems:
+        raise ValueError("Dataset does not match the expected schema:\n- " + "\n- ".join(problems))
+
+
+def coerce_schema(df):
+    validate_schema(df)
+    out = {"Student_ID": df["Student_ID"].astype(str)}
+    for col in COLUMNS[1:]:
+        if col in CATEGORIES:
+            out[col] = pd.Categorical(df[col], categories=CATEGORIES[col])
+        else:
+            out[col] = df[col].astype(NUMERIC_SCHEMA[col][0])
+    return pd.DataFrame(out, index=df.index)[COLUMNS]
+
+
+# ==== Columnar store next to the source (e.g. education_career_success.arrow) ====
+def columnar_path(source):
+    return os.path.splitext(source)[0] + ".arrow"
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stored_source_info(store):
+    # Only the footer is read here, not the data itself
+    try:
+        with pa.memory_map(store, "r") as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if metadata.get(b"schema_version") != SCHEMA_VERSION.encode():
+        return None
+    if b"source_mtime" not in metadata or b"source_sha256" not in metadata:
+        return None
+    return {
+        "mtime": int(metadata[b"source_mtime"]),
+        "sha256": metadata[b"source_sha256"].decode(),
+    }
+
+
+def _store_metadata(mtime, digest):
+    return {
+        b"schema_version": SCHEMA_VERSION.encode(),
+        b"source_mtime": str(mtime).encode(),
+        b"source_sha256": digest.encode(),
+    }
+
+
+def store_schema(metadata=None):
+    empty = coerce_schema(pd.DataFrame({col: [] for col in COLUMNS}))
+    schema = pa.Schema.from_pandas(empty, preserve_index=False)
+    if metadata:
+        schema = schema.with_metadata({**(schema.metadata or {}), **metadata})
+    return schema
+
+
+# ==== Bounded-memory store writer ====
+# A multi-batch store would make to_pandas() concatenate every column into process memory,
+# losing the zero-copy memory map in _open_store. So each chunk's buffers are appended to
+# spill files next to the store instead, one per buffer of each column (validity one byte
+# per row, values, rebased string offsets, string bytes). At the end the columns are
+# assembled from memory maps of those files and written as one record batch: the write
+# streams from the page cache and the process only ever holds about one chunk.
+PACK_ROWS = 1 << 23  # validity rows packed into a bitmap per step (a multiple of 8)
+
+
+class _SpilledColumn:
+    def __init__(self, prefix, field):
+        self.prefix, self.type = prefix, field.type
+        self.dictionary = None
+        self.length = self.null_count = self.value_bytes = 0
+        self.values_type = self.type.index_type if pa.types.is_dictionary(self.type) else self.type
+        self.is_string = pa.types.is_string(self.values_type) or pa.types.is_large_string(self.values_type)
+        self.offset_dtype = np.int64 if pa.types.is_large_string(self.values_type) else np.int32
+        parts = ["valid", "values"] + (["offsets"] if self.is_string else [])
+        self.files = {part: open(f"{prefix}.{part}", "wb") for part in parts}
+        if self.is_string:
+            self.files["offsets"].write(self.offset_dtype(0).tobytes())
+
+    def paths(self):
+        return [f"{self.prefix}.{part}" for part in ("valid", "values", "offsets", "bitmap")]
+
+    def append(self, array):
+        if pa.types.is_dictionary(self.type):
+            # Every chunk carries the full category list (coerce_schema), so one is kept
+            self.dictionary = array.dictionary
+            array = array.indices
+        valid = array.is_valid().to_numpy(zero_copy_only=False)
+        self.files["valid"].write(valid.view(np.uint8).tobytes())
+        self.null_count += array.null_count
+        if self.is_string:
+            start = array.offset * np.dtype(self.offset_dtype).itemsize
+            offsets = np.frombuffer(array.buffers()[1], self.offset_dtype, len(array) + 1, start)
+            self.files["values"].write(array.buffers()[2][offsets[0]:offsets[-1]])
+            rebased = offsets[1:] - offsets[0] + self.value_bytes  # continue after the earlier chunks
+            self.files["offsets"].write(rebased.astype(self.offset_dtype).tobytes())
+            self.value_bytes += int(offsets[-1] - offsets[0])
+        else:
+            width = self.values_type.bit_width // 8
+            start = array.offset * width
+            self.files["values"].write(array.buffers()[1][start:start + len(array) * width])
+        self.length += len(array)
+
+    def _pack_validity(self):
+        # Rows as bits, PACK_ROWS at a time; None when nothing is missing
+        if not self.null_count:
+            return None
+        valid = np.memmap(f"{self.prefix}.valid", np.uint8, "r") if self.length else np.zeros(0, np.uint8)
+        with open(f"{self.prefix}.bitmap", "wb") as f:
+            for start in range(0, self.length, PACK_ROWS):
+                f.write(np.packbits(valid[start:start + PACK_ROWS], bitorder="little").tobytes())
+        del valid
+        return _mapped(f"{self.prefix}.bitmap")
+
+    def finish(self):
+        for f in self.files.values():
+            f.close()
+        buffers = [self._pack_validity()]
+        if self.is_string:
+            buffers.append(_mapped(f"{self.prefix}.offsets"))
+        buffers.append(_mapped(f"{self.prefix}.values"))
+        array = pa.Array.from_buffers(self.values_type, self.length, buffers, self.null_count)
+        if self.dictionary is not None:
+            return pa.DictionaryArray.from_arrays(array, self.dictionary)
+        if pa.types.is_dictionary(self.type):  # no rows were written
+            return pa.array([], self.type)
+        return array
+
+
+def _mapped(path):
+    # Zero-copy view of a spill file; an empty file cannot be mapped
+    return pa.memory_map(path, "r").read_buffer() if os.path.getsize(path) else pa.py_buffer(b"")
+
+
+def write_store_chunks(chunks, store, metadata=None):
+    # Each chunk is coerced and spilled to disk, so reading the source and writing the
+    # store need memory for one chunk only, whatever the number of rows
+    schema = store_schema(metadata)
+    tmp = f"{store}.{os.getpid()}.{threading.get_ident()}.tmp"  # one per writer
+    columns = []
+    try:
+        columns = [_SpilledColumn(f"{tmp}.{i}", field) for i, field in enumerate(schema)]
+        rows = 0
+        for chunk in chunks:
+            try:
+                chunk = coerce_schema(chunk)
+            except ValueError as err:
+                raise ValueError(f"rows {rows + 1}–{rows + len(chunk)}: {err}") from err
+            rows += len(chunk)
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            for column, values in zip(columns, table.columns):
+                column.append(values.combine_chunks())
+            del table, chunk
+        batch = pa.RecordBatch.from_arrays([column.finish() for column in columns], schema=schema)
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            writer.write_batch(batch)
+        del batch
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    finally:
+        for column in columns:
+            for f in column.files.values():
+                f.close()
+            for path in column.paths():
+                if os.path.exists(path):
+                    os.remove(path)
+    # Rename at the end so a reader never sees a half-written store
+    os.replace(tmp, store)
+    return store
+
+
+# ==== Streaming readers for the supported source formats ====
+CHUNK_ROWS = 50_000
+
+
+def _iter_xlsx_chunks(source, chunk_rows):
+    import openpyxl
+
+    # read_only mode streams rows from the sheet XML instead of building the full workbook
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(name) for name in next(rows, ()) if name is not None]
+        batch = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row[:len(header)])
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def _iter_csv_chunks(source, chunk_rows):
+    yield from pd.read_csv(source, chunksize=chunk_rows)
+
+
+def iter_source_chunks(source, chunk_rows=CHUNK_ROWS):
+    name = source.lower()
+    if name.endswith((".xlsx", ".xlsm")):
+        return _iter_xlsx_chunks(source, chunk_rows)
+    if name.endswith((".csv", ".csv.gz")):
+        return _iter_csv_chunks(source, chunk_rows)
+    raise ValueError(f"Unsupported data source: {source} (expected .xlsx or .csv)")
+
+
+def build_columnar_store(source, store=None, chunk_rows=CHUNK_ROWS):
+    store = store or columnar_path(source)
+    metadata = _store_metadata(os.stat(source).st_mtime_ns, file_hash(source))
+    return write_store_chunks(iter_source_chunks(source, chunk_rows), store, metadata)
+
+
+# Sessions, the warm-up thread and other server processes can all find the store missing
+# at once. The first one builds it; the others wait for the lock, then find it up to date.
+_build_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _store_lock(store):
+    with _build_lock, open(store + ".lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+        yield
+
+
+# A source touched without a content change (copied, checked out again) keeps its store:
+# the new mtime goes into a small file next to it (e.g. education_career_success.arrow.source)
+# rather than into a rewritten store, which would cost as much as a rebuild
+def _touched_path(store):
+    return store + ".source"
+
+
+def _read_touched(store):
+    try:
+        with open(_touched_path(store)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_touched(store, mtime, digest):
+    tmp = f"{_touched_path(store)}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"mtime": mtime, "sha256": digest}, f)
+    os.replace(tmp, _touched_path(store))
+
+
+def _current_store_info(store, mtime):
+    info = _stored_source_info(store) if os.path.exists(store) else None
+    if info is None or info["mtime"] == mtime:
+        return info, info is not None
+    # Only counts for the content the store was built from
+    return info, _read_touched(store) == {"mtime": mtime, "sha256": info["sha256"]}
+
+
+def ensure_columnar_store(source=DATA_FILE):
+    # A ready-made store (e.g. one written by synth_data.py) is used as it is
+    if source.lower().endswith(".arrow"):
+        return source
+    store = columnar_path(source)
+    mtime = os.stat(source).st_mtime_ns
+    if _current_store_info(store, mtime)[1]:
+        return store
+
+    with _store_lock(store):
+        info, current = _current_store_info(store, mtime)  # another builder may have finished
+        if current:
+            return store
+        return _rebuild_store(source, store, mtime, info)
+
+
+def _rebuild_store(source, store, mtime, info):
+    digest = file_hash(source)
+    if info is not None and info["sha256"] == digest:
+        _write_touched(store, mtime, digest)  # same content: the store stays as it is
+        return store
+
+    return build_columnar_store(source, store)
+
+
+# ==== Shared loader used by every page ====
+# cache_resource hands every session the same object instead of a pickled copy.
+# The frame is built on a memory-mapped store, so numeric columns are read-only
+# views onto the page cache and memory stays flat as sessions are added.
+@st.cache_resource(max_entries=4)
+def _open_store(store, store_mtime):
+    table = pa.ipc.open_file(pa.memory_map(store, "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def load_data(source=DATA_FILE):
+    with span("load_data"):
+        store = ensure_columnar_store(source)
+        return _open_store(store, os.stat(store).st_mtime_ns)
+
+
+# Short content hash of the source; keys every cache derived from the dataset
+def dataset_version(source=DATA_FILE):
+    return _stored_source_info(ensure_columnar_store(source))["sha256"][:16]
+
+
+# ==== Command line: python data_loader.py export.csv ====
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert an .xlsx or .csv export into the columnar store.")
+    parser.add_argument("source")
+    parser.add_argument("--out", help="store path (default: next to the source)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    print(build_columnar_store(args.source, args.out, args.chunk_rows))
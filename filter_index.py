@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# ==== Columns the dataset browser filters on (the chart page uses the cube) ====
+INDEXED_COLUMNS = ["Gender", "Field_of_Study", "Current_Job_Level", "Entrepreneurship", "Age"]
+
+
+# ==== Packed row bitmaps (1 bit per row) for every value of the indexed columns ====
+class FilterIndex:
+    def __init__(self, df):
+        self.num_rows = len(df)
+        self.bitmaps = {}
+        for col in INDEXED_COLUMNS:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes = values.cat.codes.to_numpy()
+                self.bitmaps[col] = {
+                    cat: np.packbits(codes == code) for code, cat in enumerate(values.cat.categories)
+                }
+            else:
+                # Age is a small integer range, so one bucket per distinct value
+                values = values.to_numpy()
+                self.bitmaps[col] = {int(v): np.packbits(values == v) for v in np.unique(values)}
+        self._empty = np.zeros((self.num_rows + 7) // 8, dtype=np.uint8)
+        self._full = np.packbits(np.ones(self.num_rows, dtype=bool))
+
+    def values(self, col):
+        return list(self.bitmaps[col])
+
+    def any_of(self, col, values):
+        # None means "no filter on this column"
+        if values is None:
+            return self._full
+        mask = self._empty.copy()
+        for value in values:
+            bitmap = self.bitmaps[col].get(value)
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+
+    def between(self, col, low, high):
+        return self.any_of(col, [v for v in self.bitmaps[col] if low <= v <= high])
+
+
+# ==== One index per dataset version, shared by all sessions ====
+@st.cache_resource(max_entries=4)
+def get_filter_index(_df, version):
+    return FilterIndex(_df)
@@ -0,0 +1,184 @@
+import os
+import time
+import tracemalloc
+from collections import deque
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.caching import get_data_cache_stats_provider, get_resource_cache_stats_provider
+
+from chart_cache import estimate_size, get_chart_cache
+from cube import get_cube
+from data_browser import get_row_cache
+from data_loader import dataset_version, load_data
+from filter_index import get_filter_index
+
+try:
+    import psutil
+except ImportError:  # RSS then comes from /proc (Linux) or is not reported
+    psutil = None
+
+# ==== Settings ====
+RSS_HISTORY = 720  # samples kept, one per profiled rerun
+TOP_ENTRIES = 20
+# tracemalloc slows every allocation in the process, so it is only switched on from the environment
+TRACEMALLOC = os.environ.get("ECS_TRACEMALLOC", "") == "1"
+TRACE_FRAMES = 1
+_SNAPSHOT_KEY = "_memory_snapshot"
+
+
+# ==== Process RSS over time (shared by all sessions) ====
+def rss_bytes():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+@st.cache_resource
+def _rss_history():
+    return deque(maxlen=RSS_HISTORY)
+
+
+def sample_rss():
+    rss = rss_bytes()
+    if rss is not None:
+        _rss_history().append((time.time(), rss))
+    return rss
+
+
+# ==== Bytes held by shared objects and caches ====
+# Only what this process has built already: calling a builder whose cache is empty would
+# build it here (e.g. the filter index on a page that never filters) and report the cost
+# of reporting. Which builders hold an entry comes from the st.cache_resource stats.
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _frame_bytes(_df, version):
+    return int(_df.memory_usage(deep=True).sum())  # deep walks every value: once per dataset
+
+
+def shared_sizes(resource_caches):
+    sizes = {}
+    if "data_loader._open_store" in resource_caches:
+        df, version = load_data(), dataset_version()
+        sizes["dataset frame"] = _frame_bytes(df, version)
+        if "cube.get_cube" in resource_caches:
+            cube = get_cube(df, version)
+            sizes["cube"] = cube.counts.nbytes + cube.offers.nbytes
+        if "filter_index.get_filter_index" in resource_caches:
+            index = get_filter_index(df, version)
+            sizes["filter index"] = sum(b.nbytes for bitmaps in index.bitmaps.values() for b in bitmaps.values())
+    if "chart_cache.get_chart_cache" in resource_caches:
+        sizes["chart cache"] = get_chart_cache().current_bytes
+    if "data_browser.get_row_cache" in resource_caches:
+        sizes["browser row cache"] = get_row_cache().current_bytes
+    return sizes
+
+
+def streamlit_cache_sizes():
+    # st.cache_data reports pickled bytes per function; st.cache_resource only its entry
+    # count unless server.enableExpensiveMemoryStats is on
+    data = get_data_cache_stats_provider().get_stats().get("cache_memory_bytes", [])
+    resource = get_resource_cache_stats_provider().get_stats().get("cache_memory_bytes", [])
+    return (
+        {stat.cache_name: stat.byte_length for stat in data},
+        {stat.cache_name: stat.byte_length for stat in resource},
+    )
+
+
+def chart_cache_entries(resource_caches, limit=TOP_ENTRIES):
+    if "chart_cache.get_chart_cache" not in resource_caches:
+        return []
+    entries = sorted(get_chart_cache().entry_sizes(), key=lambda entry: entry[1], reverse=True)
+    return [(repr(key), size) for key, size in entries[:limit]]
+
+
+def session_sizes():
+    return {
+        key: estimate_size(value)
+        for key, value in st.session_state.items()
+        if not str(key).startswith(_SNAPSHOT_KEY)
+    }
+
+
+# ==== tracemalloc: what this session's rerun allocated since its previous one ====
+def _short_path(path):
+    if "site-packages" in path:
+        return path.split("site-packages" + os.sep, 1)[-1]
+    if path.startswith(os.getcwd()):
+        return os.path.relpath(path)
+    return os.path.basename(path)
+
+
+def tracemalloc_diff(limit=10):
+    if not TRACEMALLOC:
+        return None
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    previous = st.session_state.get(_SNAPSHOT_KEY)
+    st.session_state[_SNAPSHOT_KEY] = snapshot
+    if previous is None:
+        return []
+    return [
+        {
+            "where": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            "size_diff": stat.size_diff,
+            "count_diff": stat.count_diff,
+        }
+        for stat in snapshot.compare_to(previous, "lineno")[:limit]
+    ]
+
+
+# ==== One report per profiled rerun (goes into the JSON-lines log too) ====
+def collect_memory():
+    data_caches, resource_caches = streamlit_cache_sizes()
+    return {
+        "rss": sample_rss(),
+        "shared": shared_sizes(resource_caches),
+        "st_cache_data_bytes": data_caches,
+        "st_cache_resource_entries": resource_caches,
+        "chart_cache_entries": chart_cache_entries(resource_caches),
+        "session": session_sizes(),
+        "tracemalloc": tracemalloc_diff(),
+    }
+
+
+def _kb_table(pairs, label):
+    return pd.DataFrame({label: [name for name, _ in pairs], "KB": [size / 1024 for _, size in pairs]})
+
+
+def render_memory_panel(report):
+    kb = {"KB": st.column_config.NumberColumn(format="%.1f")}
+    with st.sidebar.expander("🧠 Memory"):
+        if report["rss"] is not None:
+            st.caption(f"Process RSS: {report['rss'] / 2**20:.1f} MB")
+            history = list(_rss_history())
+            if len(history) > 1:
+                times, rss = zip(*history)
+                st.line_chart(pd.DataFrame({"RSS (MB)": [r / 2**20 for r in rss]},
+                                           index=pd.to_datetime(times, unit="s")), height=150)
+
+        st.markdown("**Shared objects**")
+        shared = list(report["shared"].items()) + list(report["st_cache_data_bytes"].items())
+        st.dataframe(_kb_table(shared, "Object"), hide_index=True, column_config=kb)
+
+        if report["chart_cache_entries"]:
+            st.markdown("**Largest chart cache entries**")
+            st.dataframe(_kb_table(report["chart_cache_entries"], "Key"), hide_index=True, column_config=kb)
+
+        st.markdown("**This session**")
+        st.dataframe(_kb_table(sorted(report["session"].items()), "Key"), hide_index=True, column_config=kb)
+        st.caption("st.cache_resource entries: " + ", ".join(
+            f"{name.split('.')[-1]} {count}" for name, count in report["st_cache_resource_entries"].items()))
+
+        if report["tracemalloc"]:
+            st.markdown("**Allocated since the previous rerun**")
+            st.dataframe(pd.DataFrame(report["tracemalloc"]), hide_index=True)
+        elif not TRACEMALLOC:
+            st.caption("Set ECS_TRACEMALLOC=1 for allocation diffs between reruns.")
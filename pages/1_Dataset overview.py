@@ -1,31 +1,29 @@
-import pandas as pd
 import streamlit as st
 
 # ==== Page Config (nên đặt ở đầu) ====
 st.set_page_config(page_title="Education & Career Success", layout="wide")
 
-# ==== Load dataset with caching ====
-@st.cache_data
-def load_data():
-    return pd.read_excel("education_career_success.xlsx")
+# ==== Stage timings for this rerun (opt-in: ?profile=1 or ECS_PROFILE=1) ====
+import profiling
+profiling.start_run("Dataset overview")
 
-df = load_data()
+# ==== Background warm-up of the shared caches (warmup.py; started once per process) ====
+import warmup
+warmup.start()
 
-# ==== Apply global styles ====
+# ==== Load dataset (shared columnar cache) ====
+# Only the dataset is needed here, not the chart page's part of the warm-up. If the
+# warm-up is still building or opening the store, the store lock and load_data's
+# cache_resource make this wait for it rather than load it twice.
+from data_loader import load_data, dataset_version
+from data_browser import render_data_browser
+with st.spinner("Loading the dataset…"):
+    df = load_data()
+
+# ==== Apply global styles (fonts, global CSS, style.css) ====
 from utils import apply_global_styles
 apply_global_styles()
 
-# ==== Inject custom CSS & Google Fonts ====
-def inject_styles():
-    with open("style/style.css") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    st.markdown(
-        '<link href="https://fonts.googleapis.com/css2?family=Inter&family=Bungee&display=swap" rel="stylesheet">',
-        unsafe_allow_html=True
-    )
-
-inject_styles()
-
 # ==== Tab Navigation ====
 tab1, tab2, tab3 = st.tabs(["📌 Introduction", "📂 Dataset Overview", "📊 Variable Explanation"])
 
@@ -62,7 +60,8 @@ with tab2:
     """, unsafe_allow_html=True)
 
     st.markdown("<h2 style='font-family: Inter, sans-serif; color: #333; font-size: 30px;'>Dataset</h2>", unsafe_allow_html=True)
-    st.dataframe(df)
+    # Only the visible page is sent to the browser; sorting, filtering and search run here
+    render_data_browser(df, dataset_version())
 
 # === TAB 3: VARIABLE EXPLANATION ===
 with tab3:
@@ -96,3 +95,5 @@ with tab3:
             <li><code>Starting_Salary</code>: First salary (USD $25,000–$150,000)</li>
         </ul>
     """, unsafe_allow_html=True)
+
+profiling.finish_run()
@@ -1,19 +1,13 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from scipy.stats import gaussian_kde
-import numpy as np
 
 st.set_page_config(page_title="Entrepreneurship Insights", layout="wide")
 
-from utils import apply_global_styles
-apply_global_styles()
-
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter&display=swap');
+# Stage timings for this rerun (opt-in: ?profile=1 or ECS_PROFILE=1)
+import profiling
+profiling.start_run("Chart")
 
+from utils import apply_global_styles
+apply_global_styles("""
     html, body, [class*="css"] {
         font-family: 'Inter', sans-serif !important;
         color: #52504d;
@@ -26,20 +20,26 @@ st.markdown("""
         margin-bottom: 20px;
         color: #222;
     }
-    </style>
-""", unsafe_allow_html=True)
-
-def local_css(file_name):
-    with open(file_name) as f:
-        st.markdown('<style>{}</style>'.format(f.read()), unsafe_allow_html=True)
-
-local_css("style/style.css")
-
-@st.cache_data
-def load_data():
-    return pd.read_excel("education_career_success.xlsx")
-
+""")
+
+# Background warm-up (warmup.py) of the default chart state; the first session after a
+# deploy waits for it instead of computing the same results a second time
+import warmup
+warmup.start()
+if not warmup.is_ready():
+    with st.spinner("Preparing the charts…"):
+        warmup.wait()
+
+from data_loader import load_data, dataset_version
+from cube import get_cube
+from chart_cache import filter_state
+from chart_data import cached_demographics_data, cached_job_offers_data, prefetch_chart_data
+from charts import demographics_figures, job_offers_figures
 df = load_data()
+data_version = dataset_version()
+# Every chart and KPI below is derived from this pre-aggregated cube, not from raw rows
+with profiling.span("cube"):
+    cube = get_cube(df, data_version)
 
 
 # Sidebar Filters
@@ -103,24 +103,25 @@ field_of_study_notes = {
 
 
 # Gender Filter - Multiselect
-gender_options = sorted(df['Gender'].dropna().unique())
+gender_options = sorted(cube.present('Gender'))
 selected_genders = st.sidebar.multiselect("Select Gender(s)", gender_options, default=gender_options)
 
 # Handle Gender Filter
 if not selected_genders:
     st.sidebar.warning("⚠️ No gender selected. Using full data. Please choose at least one option.")
-    gender_filtered = df  # fallback to full data to avoid crash
+    gender_filter = None  # fallback to full data to avoid crash
 elif 'All' in selected_genders:
-    gender_filtered = df
+    gender_filter = None
 else:
-    gender_filtered = df[df['Gender'].isin(selected_genders)]
+    gender_filter = selected_genders
 
 # Job Level Filter
-job_levels = sorted(df['Current_Job_Level'].dropna().unique())
+job_levels = sorted(cube.present('Current_Job_Level'))
 selected_level = st.sidebar.selectbox("Select Job Level", job_levels)
 
 # Age Filter
-min_age, max_age = int(df['Age'].min()), int(df['Age'].max())
+ages_present = cube.present('Age')
+min_age, max_age = int(ages_present[0]), int(ages_present[-1])
 age_range = st.sidebar.slider("Select Age Range", min_value=min_age, max_value=max_age, value=(min_age, max_age))
 
 # Check if only one age selected
@@ -143,26 +144,31 @@ if not (show_yes or show_no):
     st.sidebar.warning("⚠️ No status selected. Using full data. Please choose at least one option.")
     selected_statuses = ['Yes', 'No']
 
-color_map = {'Yes': '#FFD700', 'No': '#004080'}
+# Canonical sidebar state: the cache key for all chart data on this page
+state = filter_state(gender_filter, selected_level, age_range, selected_statuses)
 
-# Main Tabs
-graph_tab = st.tabs(["📈 Demographics", "📊 Job Offers"])
+# Each tab is a fragment: a widget inside a tab (e.g. the chart_option selectbox) reruns
+# only that tab. Sidebar changes still rerun the whole page since both tabs depend on them.
 
 # === TAB 1 (Demographics) ===
-with graph_tab[0]:
+@st.fragment
+def demographics_tab(state, selected_level):
     st.markdown("""
         <h1 style='font-family: "Inter", sans-serif; color: #cf5a2e; font-size: 40px;'>📊 Demographics</h1>
     """, unsafe_allow_html=True)
     
-    chart_option = st.selectbox("Select Variable for Visualization", ['Gender Distribution', 'Field of Study'])
-
-    df_demo = gender_filtered[
-        (gender_filtered['Current_Job_Level'] == selected_level) &
-        (gender_filtered['Age'].between(age_range[0], age_range[1])) &
-        (gender_filtered['Entrepreneurship'].isin(selected_statuses))
-    ]
-
-    if df_demo.empty:
+    # The selectbox's own state is dropped while its tab is closed (lazy tabs), so the
+    # choice is kept under a second key and restored through index
+    chart_options = ['Gender Distribution', 'Field of Study']
+    chart_option = st.selectbox(
+        "Select Variable for Visualization", chart_options, key="chart_option",
+        index=chart_options.index(st.session_state.get("chart_option_choice", chart_options[0])),
+    )
+    st.session_state["chart_option_choice"] = chart_option
+    group_col = 'Gender' if chart_option == 'Gender Distribution' else 'Field_of_Study'
+    demo = cached_demographics_data(cube, data_version, state, group_col)
+
+    if demo["total"] == 0:
         st.warning("⚠️ Not enough data to display charts. Please adjust the filters.")
     else:
         if chart_option == 'Gender Distribution':
@@ -182,12 +188,11 @@ with graph_tab[0]:
                             <div style="font-size: 28px;">{:.1f}%</div>
                         </div>
                     </div></div>
-                """.format(len(df_demo), df_demo['Age'].median(),
-                           (df_demo['Gender'] == 'Female').mean() * 100),
+                """.format(demo["total"], demo["median_age"], demo["pct_female"]),
                 unsafe_allow_html=True)
 
         else:
-            top_fields = df_demo['Field_of_Study'].value_counts().head(3).index.tolist()
+            top_fields = demo["top_fields"]
             display_fields = ", ".join(top_fields) if top_fields else "N/A"
             with st.container():
                 st.markdown("""<div style="border: 2px solid #cf5a2e; border-radius: 12px; padding: 20px; margin-top: 10px; margin-bottom: 30px; box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);">
@@ -201,91 +206,18 @@ with graph_tab[0]:
                             <div style="font-size: 20px;">{}</div>
                         </div>
                     </div></div>
-                """.format(len(df_demo), display_fields),
+                """.format(demo["total"], display_fields),
                 unsafe_allow_html=True)
 
-        col1, col2 = st.columns(2)
-
-        with col1:
-            fig_density = go.Figure()
-            group_col = 'Gender' if chart_option == 'Gender Distribution' else 'Field_of_Study'
-            title = f"Age Distribution by {group_col.replace('_', ' ')}"
-            categories = df_demo[group_col].dropna().unique()
-
-            for cat in categories:
-                age_data = df_demo[df_demo[group_col] == cat]['Age']
-                if len(age_data) > 1:
-                    kde = gaussian_kde(age_data)
-                    x_vals = np.linspace(age_range[0], age_range[1], 100)
-                    y_vals = kde(x_vals)
-                    fig_density.add_trace(go.Scatter(
-                        x=x_vals,
-                        y=y_vals,
-                        mode='lines',
-                        name=str(cat),
-                        fill='tozeroy'
-                    ))
-
-            fig_density.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                title=title,
-                xaxis_title="Age",
-                yaxis_title="Density",
-                height=500,
-                margin=dict(t=40, l=40, r=40, b=80),
-                legend=dict(orientation="h", yanchor="bottom", y=-0.35, xanchor="center", x=0.5)
-            )
-            st.plotly_chart(fig_density, use_container_width=True)
-            
-        with col2:
-    
-            group_col = 'Gender' if chart_option == 'Gender Distribution' else 'Field_of_Study'
-
-    
-            pie_data = df_demo[group_col].value_counts().reset_index()
-            pie_data.columns = [group_col, 'Count']
+        fig_density, fig_donut = demographics_figures(cube, data_version, state, group_col)
 
-   
-            labels = pie_data[group_col]
-            values = pie_data['Count']
-
-    
-            fig_donut = go.Figure(data=[
-                go.Pie(
-                    labels=labels,
-                    values=values,
-                    hole=0.5,
-                    textinfo='percent+label',
-                    insidetextorientation='radial',
-                    marker=dict(line=dict(color='#fff', width=1))
-                )    
-            ])
-
-    
-            fig_donut.update_layout(
-                title={
-                    'text': f"{group_col.replace('_', ' ')} Distribution (Donut Chart)",
-                    'x': 0.5,
-                    'xanchor': 'center',
-                    'font': dict(size=18, color='#333')
-                },
-                legend=dict(
-                    orientation='h',
-                    yanchor='bottom',
-                    y=-0.3,
-                    xanchor='center',
-                    x=0.5,
-                    font=dict(size=12)
-                ),
-                height=500,
-                margin=dict(t=40, l=20, r=20, b=80),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-            )
+        col1, col2 = st.columns(2)
 
+        with col1, profiling.span("plotly_chart"):
+            st.plotly_chart(fig_density, width="stretch")
             
-            st.plotly_chart(fig_donut, use_container_width=True)
+        with col2, profiling.span("plotly_chart"):
+            st.plotly_chart(fig_donut, width="stretch")
 
 
 
@@ -380,20 +312,17 @@ job_offers_notes = {
     """
 }
 
-with graph_tab[1]:
+@st.fragment
+def job_offers_tab(state, selected_level, selected_statuses):
     st.markdown("""
         <h1 style='font-family: "Inter", sans-serif; color: #cf5a2e; font-size: 36px;'>Job Offers</h1>
     """, unsafe_allow_html=True)
 
 
 
-    df_filtered = gender_filtered[
-        (gender_filtered['Current_Job_Level'] == selected_level) &
-        (gender_filtered['Age'].between(age_range[0], age_range[1])) &
-        (gender_filtered['Entrepreneurship'].isin(selected_statuses))
-    ]
+    offers = cached_job_offers_data(cube, data_version, state)
 
-    if df_filtered.empty:
+    if offers["total"] == 0:
         st.warning("⚠️ Not enough data to display charts. Please adjust the filters.")
     else:
         with st.container():
@@ -412,112 +341,16 @@ with graph_tab[1]:
                         <div style="font-size: 28px;">{:.1f}%</div>
                     </div>
                 </div></div>
-            """.format(len(df_filtered), df_filtered['Age'].median(),
-                       (df_filtered['Entrepreneurship'] == "Yes").mean() * 100),
+            """.format(offers["total"], offers["median_age"], offers["pct_entrepreneurs"]),
             unsafe_allow_html=True)
 
-        df_grouped = (
-            df.groupby(['Current_Job_Level', 'Age', 'Entrepreneurship'])
-            .size()
-            .reset_index(name='Count')
-        )
-        df_grouped['Percentage'] = df_grouped.groupby(['Current_Job_Level', 'Age'])['Count'].transform(lambda x: x / x.sum())
-
-        df_bar = df_grouped[
-            (df_grouped['Current_Job_Level'] == selected_level) &
-            (df_grouped['Age'].between(age_range[0], age_range[1])) &
-            (df_grouped['Entrepreneurship'].isin(selected_statuses))
-        ]
-
-        even_ages = sorted(df_bar['Age'].unique())
-        even_ages = [age for age in even_ages if age % 2 == 0]
-
-        fig_bar = px.bar(
-            df_bar,
-            x='Age',
-            y='Percentage',
-            color='Entrepreneurship',
-            barmode='stack',
-            color_discrete_map=color_map,
-            category_orders={'Entrepreneurship': ['No', 'Yes']},
-            labels={'Age': 'Age', 'Percentage': 'Percentage'},
-            height=450,
-            width=1250,
-            title=f"Entrepreneurship Distribution by Age – {selected_level} Level"
-        )
-
-        fig_bar.update_traces(
-            hovertemplate="Entrepreneurship=%{customdata[0]}<br>Age=%{x}<br>Percentage=%{y:.0%}<extra></extra>",
-            customdata=df_bar[['Entrepreneurship']].values,
-            hoverinfo="skip"
-        )
-
-        fig_bar.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            margin=dict(t=40, l=40, r=40, b=40),
-            legend_title_text='Entrepreneurship',
-            xaxis_tickangle=0,
-            bargap=0.1,
-            xaxis=dict(tickvals=even_ages),
-            yaxis=dict(title="Percentage", range=[0, 1], tickformat=".0%"),
-            legend=dict(orientation='h', yanchor='bottom', y=-0.3, xanchor='center', x=0.5)
-        )
-
-        df_avg_offers = (
-            df_filtered
-            .groupby(['Age', 'Entrepreneurship'])['Job_Offers']
-            .mean()
-            .reset_index()
-        )
-
-        fig_line = go.Figure()
-        for status in selected_statuses:
-            data_status = df_avg_offers[df_avg_offers["Entrepreneurship"] == status]
-            fig_line.add_trace(go.Scatter(
-                x=data_status["Age"],
-                y=data_status["Job_Offers"],
-                mode="lines+markers",
-                name=status,
-                line=dict(color=color_map[status], width=2),
-                marker=dict(size=6),
-                hovertemplate="%{y:.2f}"
-            ))
-
-        fig_line.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            title=f"Average Job Offers by Age – {selected_level} Level",
-            margin=dict(t=40, l=40, r=40, b=40),
-            legend_title_text='Entrepreneurship',
-            xaxis_tickangle=0,
-            hovermode="x unified",
-            width=1250,
-            xaxis=dict(
-                showspikes=True,
-                spikemode='across',
-                spikesnap='cursor',
-                spikethickness=1.2,
-                spikedash='dot',
-                tickvals=even_ages
-            ),
-            yaxis=dict(
-                title="Average Job Offers",
-                showspikes=True,
-                spikemode='across',
-                spikesnap='cursor',
-                spikethickness=1.2,
-                spikedash='dot',
-                gridcolor='#b4adae'
-            ),
-            legend=dict(orientation='h', yanchor='bottom', y=-0.3, xanchor='center', x=0.5)
-        )
+        fig_bar, fig_line = job_offers_figures(cube, data_version, state, selected_statuses)
 
         col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(fig_bar, use_container_width=True)
-        with col2:
-            st.plotly_chart(fig_line, use_container_width=True)
+        with col1, profiling.span("plotly_chart"):
+            st.plotly_chart(fig_bar, width="stretch")
+        with col2, profiling.span("plotly_chart"):
+            st.plotly_chart(fig_line, width="stretch")
             
         # Add dual note boxes below the two charts
         note_bar = job_level_notes.get(selected_level, "No specific notes available for this level.")
@@ -549,3 +382,22 @@ with graph_tab[1]:
         
         with note_col2:
             st.markdown(note_style.format(title=f"Average Job Offers Key Note – {selected_level}", text=note_line), unsafe_allow_html=True)
+
+
+# Main Tabs
+# Lazy tabs: only the open tab computes, builds and sends its charts. Switching tabs reruns
+# the page for the other tab's.
+graph_tab = st.tabs(["📈 Demographics", "📊 Job Offers"], key="chart_tab", on_change="rerun")
+
+with graph_tab[0]:
+    if graph_tab[0].open:
+        demographics_tab(state, selected_level)
+
+with graph_tab[1]:
+    if graph_tab[1].open:
+        job_offers_tab(state, selected_level, selected_statuses)
+
+# With ECS_PREFETCH=1, the views not on screen are computed in the background from here
+prefetch_chart_data(cube, data_version, state)
+
+profiling.finish_run()
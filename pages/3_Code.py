@@ -1,46 +1,47 @@
 import streamlit as st
-import os
 
 # ==== Page Config ====
 st.set_page_config(page_title="Education & Career Success", layout="wide")
 
-# ==== Global Styles ====
-from utils import apply_global_styles
-apply_global_styles()
-
-def local_css(file_name):
-    with open(file_name) as f:
-        st.markdown('<style>{}</style>'.format(f.read()), unsafe_allow_html=True)
+# ==== Stage timings for this rerun (opt-in: ?profile=1 or ECS_PROFILE=1) ====
+import profiling
+profiling.start_run("Code")
 
-local_css("style/style.css")
+# ==== Background warm-up of the shared caches (warmup.py; started once per process) ====
+import warmup
+warmup.start()
 
-# ==== Google Fonts ====
-st.markdown("""
-    <link href="https://fonts.googleapis.com/css2?family=Inter&family=Bungee&display=swap" rel="stylesheet">
-""", unsafe_allow_html=True)
+# ==== Global Styles (fonts, global CSS, style.css, code highlighting) ====
+from utils import apply_global_styles
+from source_index import get_source, highlight_css, list_sources
+apply_global_styles(highlight_css())
 
 # ==== Page Title ====
 st.markdown("""
     <h1 style='font-family: "Inter", sans-serif; color: #cf5a2e; font-size: 40px;'>📄 Displayed Code</h1>
 """, unsafe_allow_html=True)
 
-# ==== Filter function ====
-def is_valid_py_file(file_name):
-    excluded = {"__init__.py", "utils.py", "style.py"}
-    return file_name.endswith(".py") and file_name not in excluded
-
-# ==== Load .py files from root and pages/ ====
-root_files = [f for f in os.listdir(".") if is_valid_py_file(f)]
-pages_files = [f"pages/{f}" for f in os.listdir("pages") if is_valid_py_file(f)]
-py_files = root_files + pages_files
+# ==== .py files from root and pages/ (scanned once, rescanned when a directory changes) ====
+with profiling.span("list_sources"):
+    py_files = list_sources()
 
 # ==== Dropdown ====
 selected_file = st.selectbox("Select a Python file to display", py_files)
 
-# ==== Display Code ====
+# ==== Display Code (highlighted on the server, once per file version) ====
 try:
-    with open(selected_file, "r", encoding="utf-8") as f:
-        code_content = f.read()
-    st.code(code_content, language='python')
+    with profiling.span("get_source"):
+        source = get_source(selected_file)
+    chunk = 0
+    if source.num_chunks > 1:
+        chunk = st.selectbox(
+            f"Lines ({source.num_lines:,} in total)", range(source.num_chunks),
+            format_func=lambda i: "{}–{}".format(*source.chunk_range(i)),
+        )
+    with profiling.span("highlight"):
+        html = source.chunk_html(chunk)
+    st.html(html)
 except FileNotFoundError:
     st.warning(f"File `{selected_file}` not found. Please make sure it’s in the correct directory.")
+
+profiling.finish_run()
@@ -0,0 +1,134 @@
+import contextlib
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+from profiling import current_run, traced
+
+# ==== Worker pool for the independent pieces of the chart data ====
+# ECS_POOL: "thread" (default; numpy, pandas and DuckDB release the GIL for most of their
+# work), "process" (separate interpreters, no GIL contention; a piece's inputs, such as a
+# cube slice or a WHERE clause, go in and its result comes back pickled) or "serial".
+# ECS_WORKERS: pool size (default: the CPU count, at most 4). With one CPU everything runs
+# inline.
+POOL_KIND = os.environ.get("ECS_POOL", "thread")
+WORKERS = int(os.environ.get("ECS_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+_worker = threading.local()
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+# Cached calls on a worker have no session to show their spinner in (see warmup.py)
+class _QuietWorkers(logging.Filter):
+    def filter(self, record):
+        return not getattr(_worker, "active", False)
+
+
+get_logger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(_QuietWorkers())
+
+
+# A spawned worker first re-runs sys.modules["__main__"] unless that is an importable
+# module. Under streamlit it is the page script, so every worker would run the page.
+@contextlib.contextmanager
+def _importable_main():
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = sys.modules[__name__]  # imported by name in the worker instead
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+@st.cache_resource
+def get_executor(kind=POOL_KIND, workers=WORKERS):
+    if kind == "serial" or workers <= 1:
+        return None
+    if kind == "thread":
+        return ThreadPoolExecutor(workers, thread_name_prefix="charts", initializer=_mark_worker)
+    if kind == "process":
+        # spawn, not fork: forking a server process that already runs threads is unsafe
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_mark_worker)
+        # Workers start on demand; start them all now, while __main__ is safe to re-import
+        with _importable_main():
+            for _ in range(workers):
+                executor.submit(int)
+        return executor
+    raise ValueError(f"ECS_POOL: expected thread, process or serial, got {kind!r}")
+
+
+def shares_memory():
+    # False for the process pool: its workers cannot use the caller's objects (e.g. the
+    # whole cube) without pickling them, so they rebuild their own from the mapped store
+    return POOL_KIND != "process" or get_executor() is None
+
+
+class Deferred:
+    # Stand-in for a Future when nothing runs concurrently: the call runs on the first
+    # result(), so work that nobody waits for is never done
+    def __init__(self, fn, args):
+        self._call = (fn, args)
+        self._value = None
+
+    def result(self):
+        if self._call is not None:
+            fn, args = self._call
+            self._call = None
+            self._value = fn(*args)
+        return self._value
+
+
+class _Traced:
+    # Future of a task run under profiling.traced: collecting its result also adds the
+    # task's spans to the caller's run, nested under the span open at that point
+    def __init__(self, future, run):
+        self._future = future
+        self._run = run
+
+    def result(self):
+        value, spans = self._future.result()
+        if self._run is not None:
+            self._run.merge(spans)
+            self._run = None
+        return value
+
+
+def submit(fn, *args):
+    # A Future for fn(*args) on the pool, or a Deferred without one. Calls made from
+    # inside a worker are deferred too, so a full pool can never wait on itself.
+    if getattr(_worker, "active", False):
+        return Deferred(fn, args)  # checked first: a worker process must not start a pool of its own
+    executor = get_executor()
+    if executor is None:
+        return Deferred(fn, args)
+    run = current_run()
+    if run is None:
+        return executor.submit(fn, *args)
+    return _Traced(executor.submit(traced, fn, *args), run)
+
+
+def run_all(*calls):
+    # Each (fn, *args) submitted at once; their results, in order
+    futures = [submit(*call) for call in calls]
+    return [future.result() for future in futures]
+
+
+@contextlib.contextmanager
+def inline():
+    # For batch jobs that already split their work across processes (precompute.py):
+    # every submit() in the block runs on the calling thread
+    previous = getattr(_worker, "active", False)
+    _worker.active = True
+    try:
+        yield
+    finally:
+        _worker.active = previous
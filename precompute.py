@@ -0,0 +1,142 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from chart_cache import filter_state
+from chart_data import (GROUP_COLUMNS, PRECOMPUTED_FILE, PRECOMPUTED_FORMAT, demographics_data,
+                        job_offers_data)
+from cube import get_cube
+from data_loader import dataset_version, load_data
+from parallel import inline
+from result_store import code_version
+
+# ==== Sidebar state space of the chart page ====
+STATUS_SETS = [["Yes", "No"], ["Yes"], ["No"]]
+
+
+def gender_sets(genders, subsets=True):
+    # None is what the page uses when nothing is selected; otherwise every non-empty subset
+    if not subsets:
+        return [None, genders]
+    return [None] + [list(c) for n in range(1, len(genders) + 1) for c in itertools.combinations(genders, n)]
+
+
+def age_ranges(ages, spec=("all",)):
+    # "all": every (low, high) with low < high (one age falls back to the full range);
+    # otherwise a list like ["full", "22-26"], where "full" is the full range
+    spec, full = list(spec), (ages[0], ages[-1])
+    if spec == ["all"]:
+        return [(lo, hi) for lo, hi in itertools.combinations(ages, 2)]
+    return [full if item == "full" else tuple(int(v) for v in item.split("-")) for item in spec]
+
+
+def enumerate_states(cube, levels=None, subsets=True, ages=("all",)):
+    levels = levels or sorted(cube.present("Current_Job_Level"))
+    genders = sorted(cube.present("Gender"))
+    for level, gender, age_range, statuses in itertools.product(
+        levels, gender_sets(genders, subsets), age_ranges(cube.present("Age"), ages), STATUS_SETS
+    ):
+        yield filter_state(gender, level, age_range, statuses)
+
+
+# ==== Compact values: plain arrays only, so the app unpickles them quickly ====
+# Curves reach the browser as float32 anyway (charts.compact). pandas objects become
+# arrays plus the labels they use (see chart_data.unpack).
+def _pack_column(values):
+    if values.dtype.kind in "biuf":
+        return values.to_numpy()
+    labels, codes = np.unique(values.to_numpy(dtype=object), return_inverse=True)
+    return ("labels", labels.tolist(), codes.astype(np.int8))
+
+
+def pack(value):
+    if isinstance(value, pd.DataFrame):
+        return ("frame", {col: _pack_column(value[col]) for col in value.columns})
+    if isinstance(value, pd.Series):
+        return ("series", value.index.tolist(), value.to_numpy(), value.name)
+    if isinstance(value, np.ndarray) and value.dtype == np.float64:
+        return value.astype(np.float32)
+    if isinstance(value, dict):
+        return {k: pack(v) for k, v in value.items()}
+    return value
+
+
+def precompute(states, cube, version):
+    results = {}
+    with inline():  # states are what is split across workers, not one state's pieces
+        for state in states:
+            for group_col in GROUP_COLUMNS:
+                key = ("demographics", "pandas", version, state, group_col)
+                results[key] = pack(demographics_data(cube, state, group_col))
+            results[("job_offers", "pandas", version, state)] = pack(job_offers_data(cube, version, state))
+    return results
+
+
+# ==== Worker processes: each loads the (memory-mapped) store and cube once ====
+_worker_cube = None
+
+
+def _init_worker():
+    global _worker_cube
+    _worker_cube = get_cube(load_data(), dataset_version())
+
+
+def _precompute_chunk(states):
+    return precompute(states, _worker_cube, dataset_version())
+
+
+def precompute_parallel(states, cube, version, workers, chunk=64):
+    if workers <= 1:
+        return precompute(states, cube, version)
+    chunks = [states[i:i + chunk] for i in range(0, len(states), chunk)]
+    results = {}
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker) as pool:
+        for part in pool.map(_precompute_chunk, chunks):
+            results.update(part)
+    return results
+
+
+def write_artifact(results, version, path=PRECOMPUTED_FILE):
+    artifact = {
+        "format": PRECOMPUTED_FORMAT,
+        "dataset_version": version,
+        "code_version": code_version(),
+        "results": results,
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+
+# ==== Command line: python precompute.py [--levels Entry Mid] [--ages full] ====
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute chart data for the chart page's filter states.")
+    parser.add_argument("--levels", nargs="+", help="job levels (default: all)")
+    parser.add_argument("--no-gender-subsets", action="store_true",
+                        help="only 'all genders' instead of every gender subset")
+    parser.add_argument("--ages", nargs="+", default=["all"],
+                        help="'all' age ranges, 'full' only, or ranges like 18-29 22-26")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1)")
+    parser.add_argument("--out", default=PRECOMPUTED_FILE)
+    args = parser.parse_args()
+
+    df = load_data()
+    version = dataset_version()
+    cube = get_cube(df, version)
+    states = list(enumerate_states(cube, args.levels, not args.no_gender_subsets, args.ages))
+
+    start = time.perf_counter()
+    results = precompute_parallel(states, cube, version, args.workers)
+    path = write_artifact(results, version, args.out)
+    print(f"{len(states):,} filter states, {len(results):,} results in {time.perf_counter() - start:.1f} s "
+          f"-> {path} ({os.path.getsize(path) / 2**20:.1f} MB)")
@@ -0,0 +1,150 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from chart_cache import get_chart_cache
+
+# ==== Switches: ECS_PROFILE=1 profiles every session, ?profile=1 in the URL only that one ====
+PROFILE_ALL = os.environ.get("ECS_PROFILE", "") == "1"
+PROFILE_LOG = os.environ.get("ECS_PROFILE_LOG", "profile.jsonl")  # empty string: no log file
+
+# Each rerun runs on its own script thread, so the current run is thread-local.
+# When profiling is off there is no run and span() hands back one shared no-op context.
+_local = threading.local()
+_NO_SPAN = contextlib.nullcontext()
+_log_lock = threading.Lock()
+
+
+# ==== One rerun: named spans (nested by depth) plus chart cache counters ====
+class Run:
+    def __init__(self, page):
+        self.page = page
+        self.spans = []  # [name, depth, ms] in start order
+        self.depth = 0
+        self.started = time.perf_counter()
+        self.cache = {"hits": 0, "misses": 0, "shared_hits": 0}  # this rerun's chart cache lookups
+
+    @contextlib.contextmanager
+    def span(self, name):
+        record = [name, self.depth, 0.0]
+        self.spans.append(record)
+        self.depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record[2] = (time.perf_counter() - start) * 1000
+            self.depth -= 1
+
+    def merge(self, spans):
+        # Spans of a pool task (see traced), nested under the span open now
+        self.spans += [[name, self.depth + depth, ms] for name, depth, ms in spans]
+
+    def summary(self):
+        cache = get_chart_cache().stats()
+        hits, misses, shared_hits = self.cache["hits"], self.cache["misses"], self.cache["shared_hits"]
+        ctx = get_script_run_ctx()
+        return {
+            "ts": time.time(),
+            "session": ctx.session_id if ctx else None,
+            "page": self.page,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "spans": [{"name": n, "depth": d, "ms": round(ms, 3)} for n, d, ms in self.spans],
+            "chart_cache": {
+                "hits": hits,
+                "misses": misses,
+                "shared_hits": shared_hits,
+                "hit_rate": hits / (hits + misses) if hits + misses else None,
+                "overall_hit_rate": cache["hit_rate"],
+                "entries": cache["entries"],
+                "bytes": cache["bytes"],
+            },
+        }
+
+
+def is_enabled():
+    return PROFILE_ALL or st.query_params.get("profile") == "1"
+
+
+def start_run(page):
+    _local.run = Run(page) if is_enabled() else None
+
+
+def span(name):
+    run = getattr(_local, "run", None)
+    return _NO_SPAN if run is None else run.span(name)
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def traced(fn, *args):
+    # Runs fn on a pool worker under a run of its own, since the caller's run is on
+    # another thread (or in another process); returns (result, spans) for Run.merge
+    _local.run = Run(None)
+    try:
+        return fn(*args), _local.run.spans
+    finally:
+        _local.run = None
+
+
+def cache_counts():
+    # Counters for chart cache lookups made by this rerun (None when not profiling)
+    run = getattr(_local, "run", None)
+    return None if run is None else run.cache
+
+
+def write_log(record):
+    if not PROFILE_LOG:
+        return
+    line = json.dumps(record, ensure_ascii=False)
+    with _log_lock, open(PROFILE_LOG, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+# ==== End of the page: JSON-lines record and the sidebar debug panel ====
+def finish_run():
+    run = getattr(_local, "run", None)
+    if run is None:
+        return
+    _local.run = None
+    record = run.summary()
+    # Imported here: memory_stats reaches the data loader, which itself uses span()
+    from memory_stats import collect_memory, render_memory_panel
+    from warmup import status as warmup_status
+    record["memory"] = collect_memory()
+    record["warmup"] = warmup_status().as_dict()
+    write_log(record)
+
+    cache = record["chart_cache"]
+    with st.sidebar.expander("⏱️ Profiling", expanded=True):
+        st.caption(f"{run.page} · {record['total_ms']:.1f} ms this rerun")
+        st.dataframe(
+            pd.DataFrame({
+                "Stage": ["\u2003" * s["depth"] + s["name"] for s in record["spans"]],
+                "ms": [s["ms"] for s in record["spans"]],
+            }),
+            hide_index=True,
+            column_config={"ms": st.column_config.NumberColumn(format="%.2f")},
+        )
+        rerun_rate = "–" if cache["hit_rate"] is None else f"{cache['hit_rate']:.0%}"
+        st.caption(
+            f"Chart cache: {cache['hits']} hits / {cache['misses']} misses this rerun ({rerun_rate}, "
+            f"{cache['shared_hits']} of the misses served by the shared store), "
+            f"{cache['overall_hit_rate']:.0%} overall · {cache['entries']} entries, "
+            f"{cache['bytes'] / 2**20:.1f} MB"
+        )
+        warmup = record["warmup"]
+        if warmup["state"] in ("idle", "running"):
+            st.caption(f"Warm-up: {warmup['state']}" + (f" ({warmup['step']})" if warmup["step"] else ""))
+        else:
+            st.caption(f"Warm-up: {warmup['state']} in {warmup['seconds']:.1f} s"
+                       + (f" – {warmup['error']}" if warmup["error"] else ""))
+    render_memory_panel(record["memory"])
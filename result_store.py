@@ -0,0 +1,188 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from streamlit.logger import get_logger
+
+# ==== Result store shared by every app process on the host ====
+# ECS_RESULT_CACHE picks the backend: "sqlite:<file>", "file:<directory>" or "none".
+# The chart cache looks here after a miss in its own memory, so a freshly started
+# worker reuses what the other workers already computed.
+RESULT_CACHE = os.environ.get("ECS_RESULT_CACHE", "sqlite:.cache/results.sqlite")
+RESULT_CACHE_MB = int(os.environ.get("ECS_RESULT_CACHE_MB", "256"))
+
+_log = get_logger(__name__)
+
+# Stored results are only valid for the code that produced them
+CODE_FILES = ["chart_data.py", "charts.py", "cube.py", "kde.py", "sql_backend.py"]
+
+
+def code_version():
+    digest = hashlib.sha256()
+    for name in CODE_FILES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+# ==== Shared part of every backend: key hashing, pickling, never failing the page ====
+class ResultStore:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.namespace = code_version()
+        self.errors = 0
+
+    def digest(self, key):
+        # Keys are tuples of (function, dataset version, arguments...) with plain values,
+        # so their repr is the same in every process
+        return hashlib.sha256(f"{self.namespace}:{key!r}".encode()).hexdigest()
+
+    def get(self, key, default=None):
+        try:
+            blob = self._read(self.digest(key))
+            return default if blob is None else pickle.loads(blob)
+        except Exception:
+            self.errors += 1  # a broken or busy store is just a miss
+            return default
+
+    def put(self, key, value):
+        try:
+            self._write(self.digest(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            self.errors += 1
+
+
+# ==== SQLite (WAL) backend ====
+class SQLiteStore(ResultStore):
+    TOUCH_EVERY = 60  # seconds between "last used" updates, to keep reads from writing
+
+    def __init__(self, path, max_bytes):
+        super().__init__(max_bytes)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()  # one connection per thread
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; writers wait up to 10 s for each other instead of failing
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _read(self, digest):
+        conn = self._connection()
+        row = conn.execute("SELECT value, used FROM results WHERE key = ?", (digest,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > self.TOUCH_EVERY:
+            conn.execute("UPDATE results SET used = ? WHERE key = ?", (now, digest))
+        return row[0]
+
+    def _write(self, digest, blob):
+        if len(blob) > self.max_bytes:
+            return
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                         (digest, blob, len(blob), time.time()))
+            excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0] - self.max_bytes
+            if excess > 0:
+                # Least recently used first, until the total fits again
+                victims = []
+                for key, size in conn.execute("SELECT key, size FROM results ORDER BY used"):
+                    victims.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany("DELETE FROM results WHERE key = ?", victims)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+# ==== Plain files backend (one file per result, written with rename) ====
+class FileStore(ResultStore):
+    SWEEP_EVERY = 32  # writes between size checks
+
+    def __init__(self, directory, max_bytes):
+        super().__init__(max_bytes)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._writes = 0
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest[:2], digest + ".pkl")
+
+    def _read(self, digest):
+        path = self._path(digest)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # mtime is the "last used" time for eviction
+        return blob
+
+    def _write(self, digest, blob):
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)  # readers see the old file or the new one, never half of one
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self.sweep()
+
+    def sweep(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pkl"):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except FileNotFoundError:
+                        continue  # removed by another process meanwhile
+                    entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        excess = sum(size for _, size, _ in entries) - self.max_bytes
+        for _, size, path in sorted(entries):
+            if excess <= 0:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            excess -= size
+
+
+BACKENDS = {"sqlite": SQLiteStore, "file": FileStore}
+
+
+def open_result_store(spec=RESULT_CACHE, max_mb=RESULT_CACHE_MB):
+    if not spec or spec == "none":
+        return None
+    kind, _, location = spec.partition(":")
+    if kind not in BACKENDS or not location:
+        raise ValueError(f"ECS_RESULT_CACHE: expected sqlite:<file>, file:<directory> or none, got {spec!r}")
+    try:
+        return BACKENDS[kind](location, max_mb * 2**20)
+    except Exception:
+        # Unwritable directory, locked or corrupt database...: run without the shared
+        # store, like any other store error, instead of failing every chart page
+        _log.exception("Result store %r unavailable, continuing without it", spec)
+        return None
@@ -0,0 +1,101 @@
+import os
+
+import pygments
+import streamlit as st
+from pygments import lex
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import PythonLexer
+
+# ==== Files shown on the Code page ====
+SOURCE_DIRS = [".", "pages"]
+EXCLUDED = {"__init__.py", "utils.py", "style.py"}
+CHUNK_LINES = 300  # larger files are highlighted one chunk at a time, on demand
+CODE_CLASS = "source-code"
+CODE_STYLE = "friendly"
+
+
+def is_valid_py_file(file_name):
+    return file_name.endswith(".py") and file_name not in EXCLUDED
+
+
+# ==== Directory scan, redone only when a directory's mtime changes ====
+@st.cache_resource(max_entries=4)
+def _scan(dir_mtimes):
+    files = []
+    for directory in SOURCE_DIRS:
+        names = sorted(f for f in os.listdir(directory) if is_valid_py_file(f))
+        files += [name if directory == "." else f"{directory}/{name}" for name in names]
+    return files
+
+
+def list_sources():
+    return _scan(tuple(os.stat(d).st_mtime_ns for d in SOURCE_DIRS))
+
+
+# ==== One file: contents, token lines and highlighted HTML chunks ====
+def _token_lines(content):
+    # Lex the whole file once, then cut the token stream at line ends so every
+    # chunk is highlighted with the right context (e.g. inside a multi-line string)
+    lines, line = [], []
+    for ttype, value in lex(content, PythonLexer()):
+        for piece in value.splitlines(keepends=True):
+            line.append((ttype, piece))
+            if piece.endswith("\n"):
+                lines.append(line)
+                line = []
+    if line:
+        lines.append(line)
+    return lines
+
+
+class SourceFile:
+    def __init__(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            self.content = f.read()
+        self.lines = _token_lines(self.content)
+        self.num_lines = len(self.lines)
+        self.num_chunks = max(1, -(-self.num_lines // CHUNK_LINES))
+        self._html = {}
+
+    def chunk_range(self, chunk):
+        start = chunk * CHUNK_LINES
+        return start + 1, min(start + CHUNK_LINES, self.num_lines)
+
+    def chunk_html(self, chunk=0):
+        if chunk not in self._html:
+            start = chunk * CHUNK_LINES
+            formatter = HtmlFormatter(style=CODE_STYLE, cssclass=CODE_CLASS,
+                                      linenos="table", linenostart=start + 1)
+            tokens = [tok for line in self.lines[start:start + CHUNK_LINES] for tok in line]
+            self._html[chunk] = pygments.format(tokens, formatter)
+        return self._html[chunk]
+
+
+# Keyed by mtime and size, so an edited file is re-read on the next rerun
+@st.cache_resource(max_entries=64)
+def _load_source(path, mtime_ns, size):
+    return SourceFile(path)
+
+
+def get_source(path):
+    stat = os.stat(path)
+    return _load_source(path, stat.st_mtime_ns, stat.st_size)
+
+
+def highlight_css():
+    # The global `* { font-family: Inter }` rule would otherwise reach the code too
+    return HtmlFormatter(style=CODE_STYLE).get_style_defs(f".{CODE_CLASS}") + f"""
+    .{CODE_CLASS} pre, .{CODE_CLASS} pre * {{
+        font-family: 'Source Code Pro', monospace !important;
+        font-size: 14px;
+    }}
+    .{CODE_CLASS} {{
+        overflow-x: auto;
+        border-radius: 8px;
+    }}
+    .{CODE_CLASS} .linenos {{
+        user-select: none;
+        opacity: 0.6;
+        padding-right: 12px;
+    }}
+"""
@@ -0,0 +1,180 @@
+import os
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import streamlit as st
+
+from cube import AGES
+from data_loader import CATEGORIES, DATA_FILE, ensure_columnar_store
+from kde import age_density_curves
+from parallel import run_all
+from profiling import span
+
+# ==== DuckDB over the columnar store ====
+# The store is scanned in place through a pyarrow dataset: DuckDB pushes the column list
+# and the WHERE clause into the scan and splits it across threads, so only the matching
+# rows of the needed columns are ever read. ECS_SQL_THREADS caps the scan threads.
+SQL_THREADS = int(os.environ.get("ECS_SQL_THREADS", "0")) or os.cpu_count() or 1
+
+
+# One connection per store, shared by every session. Each query runs on its own cursor
+# (DuckDB connections are not thread-safe, cursors are cheap). A registered dataset is only
+# visible to the cursor it is registered on, so each cursor registers the shared one.
+@st.cache_resource(max_entries=4)
+def _connect(store, store_mtime):
+    conn = duckdb.connect()
+    conn.execute(f"SET GLOBAL threads = {SQL_THREADS}")  # database-wide: applies to every cursor
+    return conn, ds.dataset(store, format="ipc")
+
+
+def connection(source=DATA_FILE):
+    store = ensure_columnar_store(source)
+    return _connect(store, os.stat(store).st_mtime_ns)
+
+
+def query(sql, params=()):
+    conn, dataset = connection()
+    with span("sql"), conn.cursor() as cursor:
+        cursor.register("students", dataset)
+        return cursor.execute(sql, list(params)).fetchall()
+
+
+# ==== WHERE clause for a chart page filter state (see chart_cache.filter_state) ====
+def _in(column, values):
+    if not values:
+        return "FALSE", []
+    return f"{column} IN ({', '.join('?' * len(values))})", list(values)
+
+
+def where_clause(state):
+    genders, level, age_range, statuses = state
+    clauses, params = ["Current_Job_Level = ?", "Age BETWEEN ? AND ?"], [level, *age_range]
+    for column, values in (("Gender", genders), ("Entrepreneurship", statuses)):
+        if values is not None:
+            clause, values = _in(column, values)
+            clauses.append(clause)
+            params += values
+    return " AND ".join(clauses), params
+
+
+# ==== Aggregates, shaped like the cube functions they replace ====
+def summary(where, params, dim, label):
+    # row count, median age (NaN when empty) and the share of rows where dim = label
+    total, median, matching = query(
+        f"SELECT COUNT(*), MEDIAN(Age), COUNT(*) FILTER (WHERE {dim} = ?) FROM students WHERE {where}",
+        [label, *params],
+    )[0]
+    share = matching / total if total else 0.0
+    return total, float("nan") if median is None else float(median), share
+
+
+def _labels(labels, positions):
+    # Labels picked by position (list_position is 1-based) from the same label list the
+    # cube's axis has, so even an empty result gets the cube's dtype
+    return pd.Index(labels)[[i - 1 for i in positions]]
+
+
+def category_counts(where, params, dim):
+    # Like cube.category_counts: non-empty categories, largest first, ties in category order
+    rows = query(
+        f"SELECT list_position(?, {dim}) AS i, COUNT(*) AS n FROM students WHERE {where} "
+        "GROUP BY i ORDER BY n DESC, i",
+        [CATEGORIES[dim], *params],
+    )
+    return pd.Series(np.array([n for _, n in rows], dtype=np.int64),
+                     index=_labels(CATEGORIES[dim], [i for i, _ in rows]), name="Count")
+
+
+def age_counts_by(where, params, dim, ages):
+    # category -> row count per age, for the categories present, in category order
+    rows = query(f"SELECT {dim}, Age, COUNT(*) FROM students WHERE {where} GROUP BY {dim}, Age", params)
+    matrix = np.zeros((len(CATEGORIES[dim]), len(ages)), dtype=np.int64)
+    for label, age, n in rows:
+        matrix[CATEGORIES[dim].index(label), ages.index(age)] = n
+    return {label: matrix[i] for i, label in enumerate(CATEGORIES[dim]) if matrix[i].sum() > 0}
+
+
+def entrepreneurship_share(level, age_range, statuses):
+    # Percentage is within each age of the level, so statuses are applied after the window
+    status_clause, status_params = _in("Entrepreneurship", statuses)
+    rows = query(
+        "SELECT Age, list_position(?, Entrepreneurship) AS i, COUNT(*) AS n, "
+        "COUNT(*) / SUM(COUNT(*)) OVER (PARTITION BY Age) "
+        "FROM students WHERE Current_Job_Level = ? AND Age BETWEEN ? AND ? "
+        f"GROUP BY Age, Entrepreneurship QUALIFY {status_clause} ORDER BY Age, i",
+        [CATEGORIES["Entrepreneurship"], level, *age_range, *status_params],
+    )
+    ages, positions, counts, percentages = zip(*rows) if rows else ((), (), (), ())
+    return pd.DataFrame({
+        "Current_Job_Level": [level] * len(rows),
+        "Age": np.array(ages, dtype=np.int64),
+        "Entrepreneurship": _labels(CATEGORIES["Entrepreneurship"], positions),
+        "Count": np.array(counts, dtype=np.int64),
+        "Percentage": np.array(percentages, dtype=float),
+    })
+
+
+def average_offers(where, params, statuses):
+    statuses = [label for label in CATEGORIES["Entrepreneurship"] if label in statuses]
+    rows = query(
+        "SELECT Age, list_position(?, Entrepreneurship) AS i, SUM(Job_Offers) / COUNT(*) "
+        f"FROM students WHERE {where} GROUP BY Age, Entrepreneurship ORDER BY Age, i",
+        [statuses, *params],
+    )
+    ages, positions, means = zip(*rows) if rows else ((), (), ())
+    return pd.DataFrame({
+        "Age": np.array(ages, dtype=np.int64),
+        "Entrepreneurship": _labels(statuses, positions),
+        "Job_Offers": np.array(means, dtype=float),
+    })
+
+
+# ==== Chart-ready data, identical to chart_data.demographics_data / job_offers_data ====
+# Each query is a piece of its own on the worker pool (parallel.py), so they run at once
+def _density_curves(where, params, group_col, ages, x_vals):
+    age_counts = age_counts_by(where, params, group_col, ages)
+    with span("kde"):
+        return age_density_curves(ages, age_counts, x_vals)
+
+
+def demographics_data(state, group_col):
+    _, _, age_range, _ = state
+    where, params = where_clause(state)
+    ages = [age for age in AGES if age_range[0] <= age <= age_range[1]]
+    x_vals = np.linspace(age_range[0], age_range[1], 100)
+    with span("aggregates"):
+        (total, median, female), fields, donut, curves = run_all(
+            (summary, where, params, "Gender", "Female"),
+            (category_counts, where, params, "Field_of_Study"),
+            (category_counts, where, params, group_col),
+            (_density_curves, where, params, group_col, ages, x_vals),
+        )
+    return {
+        "total": total,
+        "median_age": median,
+        "pct_female": female * 100,
+        "top_fields": fields.head(3).index.tolist(),
+        "x_vals": x_vals,
+        "donut": donut,
+        "curves": curves,
+    }
+
+
+def job_offers_data(state):
+    _, level, age_range, statuses = state
+    where, params = where_clause(state)
+    with span("aggregates"):
+        (total, median, entrepreneurs), bar, line = run_all(
+            (summary, where, params, "Entrepreneurship", "Yes"),
+            (entrepreneurship_share, level, age_range, statuses),
+            (average_offers, where, params, statuses),
+        )
+        return {
+            "total": total,
+            "median_age": median,
+            "pct_entrepreneurs": entrepreneurs * 100,
+            "bar": bar if total else None,
+            "line": line,
+        }
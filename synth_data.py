@@ -0,0 +1,128 @@
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (CATEGORIES, CHUNK_ROWS, COLUMNS, DATA_FILE, NUMERIC_SCHEMA,
+                         _store_metadata, file_hash, load_data, write_store_chunks)
+
+# ==== Synthetic datasets for load tests (e.g. 50k, 500k, 5M rows) ====
+# Bump when the generator changes so stores made by an older version get a new dataset version
+SYNTH_VERSION = "1"
+
+# Sampled together, so the chart page sees the same level/age/entrepreneurship mix
+JOINT = ["Current_Job_Level", "Age", "Entrepreneurship"]
+# Job_Offers is drawn per (level, age, entrepreneurship) cell: it is what the Job Offers tab plots
+CONDITIONAL = "Job_Offers"
+# Step of the values in the real file; every other numeric column holds whole numbers
+RESOLUTION = {"High_School_GPA": 0.01, "University_GPA": 0.01, "Starting_Salary": 100}
+# Columns with more distinct values than this are sampled from their quantile function
+MAX_DISCRETE = 20
+QUANTILES = np.linspace(0, 1, 1001)
+
+
+# ==== Fitting: empirical marginals plus the joint above, from the real data ====
+def _pmf(values, labels):
+    counts = pd.Series(values).value_counts().reindex(labels, fill_value=0).to_numpy(dtype=float)
+    return counts / counts.sum()
+
+
+def fit_model(df):
+    model = {"categorical": {}, "discrete": {}, "quantiles": {}}
+
+    for col, labels in CATEGORIES.items():
+        if col not in JOINT:
+            model["categorical"][col] = _pmf(df[col], labels)
+
+    for col, (_, low, high) in NUMERIC_SCHEMA.items():
+        if col in JOINT or col == CONDITIONAL:
+            continue
+        if col not in RESOLUTION and high - low <= MAX_DISCRETE:
+            levels = np.arange(low, high + 1)
+            model["discrete"][col] = (levels, _pmf(df[col], levels))
+        else:
+            model["quantiles"][col] = np.quantile(df[col].to_numpy(dtype=float), QUANTILES)
+
+    # Joint counts over level x age x entrepreneurship, flattened in JOINT order
+    labels = [CATEGORIES[col] if col in CATEGORIES else
+              list(range(NUMERIC_SCHEMA[col][1], NUMERIC_SCHEMA[col][2] + 1)) for col in JOINT]
+    codes = [pd.Categorical(df[col], categories=cats).codes for col, cats in zip(JOINT, labels)]
+    cells = np.ravel_multi_index(codes, [len(cats) for cats in labels])
+    num_cells = int(np.prod([len(cats) for cats in labels]))
+    joint = np.bincount(cells, minlength=num_cells).astype(float)
+    model["joint"] = (labels, joint / joint.sum())
+
+    # Job_Offers per joint cell, as cumulative distributions over its values
+    low, high = NUMERIC_SCHEMA[CONDITIONAL][1:]
+    offers = df[CONDITIONAL].to_numpy().astype(int) - low
+    table = np.zeros((num_cells, high - low + 1))
+    np.add.at(table, (cells, offers), 1)
+    table /= np.maximum(table.sum(axis=1, keepdims=True), 1)
+    model["conditional"] = (np.arange(low, high + 1), np.cumsum(table, axis=1))
+    return model
+
+
+# ==== Sampling, one chunk at a time ====
+def _round_to(values, step):
+    return np.round(values / step) * step
+
+
+def sample_chunk(model, rng, start, size, id_width):
+    out = {"Student_ID": "S" + pd.Series(np.arange(start + 1, start + size + 1)).astype(str).str.zfill(id_width)}
+
+    labels, joint = model["joint"]
+    cells = rng.choice(joint.size, size=size, p=joint)
+    for col, cats, codes in zip(JOINT, labels, np.unravel_index(cells, [len(c) for c in labels])):
+        out[col] = pd.Categorical.from_codes(codes, categories=cats) if col in CATEGORIES else np.asarray(cats)[codes]
+
+    values, cdf = model["conditional"]
+    u = rng.random(size)
+    out[CONDITIONAL] = values[np.minimum((u[:, None] > cdf[cells]).sum(axis=1), len(values) - 1)]
+
+    for col, pmf in model["categorical"].items():
+        out[col] = pd.Categorical.from_codes(rng.choice(len(pmf), size=size, p=pmf), categories=CATEGORIES[col])
+
+    for col, (levels, pmf) in model["discrete"].items():
+        out[col] = rng.choice(levels, size=size, p=pmf)
+
+    for col, quantiles in model["quantiles"].items():
+        _, low, high = NUMERIC_SCHEMA[col]
+        drawn = np.interp(rng.random(size), QUANTILES, quantiles)
+        out[col] = np.clip(_round_to(drawn, RESOLUTION.get(col, 1)), low, high)
+
+    return pd.DataFrame(out)[COLUMNS]
+
+
+def iter_synthetic_chunks(model, rows, chunk_rows=CHUNK_ROWS, seed=0):
+    rng = np.random.default_rng(seed)
+    id_width = max(5, len(str(rows)))
+    for start in range(0, rows, chunk_rows):
+        yield sample_chunk(model, rng, start, min(chunk_rows, rows - start), id_width)
+
+
+# ==== Synthetic columnar store (point ECS_DATA_FILE at it to run the app on it) ====
+def synthetic_path(rows, source=DATA_FILE):
+    return f"{os.path.splitext(source)[0]}_synthetic_{rows}.arrow"
+
+
+def write_synthetic_store(rows, store=None, source=DATA_FILE, chunk_rows=CHUNK_ROWS, seed=0):
+    store = store or synthetic_path(rows, source)
+    model = fit_model(load_data(source))
+    # The "source" of a synthetic store is the real file plus the generator settings
+    key = f"{file_hash(source)}:{rows}:{seed}:{SYNTH_VERSION}"
+    metadata = _store_metadata(0, hashlib.sha256(key.encode()).hexdigest())
+    return write_store_chunks(iter_synthetic_chunks(model, rows, chunk_rows, seed), store, metadata)
+
+
+# ==== Command line: python synth_data.py 500000 ====
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic columnar store fitted to the real dataset.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--source", default=DATA_FILE, help="real dataset to fit (default: %(default)s)")
+    parser.add_argument("--out", help="store path (default: <source>_synthetic_<rows>.arrow)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(write_synthetic_store(args.rows, args.out, args.source, args.chunk_rows, args.seed))
@@ -0,0 +1,60 @@
+import functools
+import os
+
+import streamlit as st
+from PIL import Image
+
+from data_loader import file_hash
+from profiling import span
+
+# ==== Thumbnail cache on disk (next to the images, ignored by git) ====
+THUMB_DIR = "image/.thumbs"
+THUMB_QUALITY = 85
+
+
+@functools.lru_cache(maxsize=256)
+def _source_digest(source, mtime_ns, size):
+    # Re-hashed only when the file's mtime or size changes
+    return file_hash(source)[:12]
+
+
+def thumbnail_path(source, width, digest, ext):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(THUMB_DIR, f"{stem}-{digest}-{width}w.{ext}")
+
+
+def build_thumbnail(source, width, path):
+    # st.image passes JPEG/PNG bytes through untouched when they already fit the
+    # display width, so the thumbnail is made in exactly that shape
+    with Image.open(source) as img:
+        has_alpha = "A" in img.getbands()
+        img = img.convert("RGBA" if has_alpha else "RGB")
+        if img.width > width:
+            height = round(img.height * width / img.width)
+            img = img.resize((width, height), Image.LANCZOS)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        if has_alpha:
+            img.save(tmp, "PNG", optimize=True)
+        else:
+            img.save(tmp, "JPEG", quality=THUMB_QUALITY, optimize=True, progressive=True)
+    os.replace(tmp, path)
+
+
+# Encoded bytes are kept in memory and shared by every session
+@st.cache_resource(max_entries=64)
+def _thumbnail_bytes(source, display_width, digest):
+    with Image.open(source) as img:
+        ext = "png" if "A" in img.getbands() else "jpg"
+    path = thumbnail_path(source, display_width, digest, ext)
+    if not os.path.exists(path):
+        build_thumbnail(source, display_width, path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def thumbnail(source, display_width):
+    with span("thumbnail"):
+        stat = os.stat(source)
+        digest = _source_digest(source, stat.st_mtime_ns, stat.st_size)
+        return _thumbnail_bytes(source, display_width, digest)
@@ -0,0 +1,151 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+from chart_cache import filter_state
+from chart_data import GROUP_COLUMNS, precomputed
+from charts import demographics_figures, job_offers_figures
+from cube import entrepreneurship_share_by_level, get_cube
+from data_loader import dataset_version, load_data
+from filter_index import get_filter_index
+from parallel import get_executor
+
+# ==== Warm-up of the shared caches, once per server process ====
+# Runs on a background thread: from the start when the server is launched with
+# `python warmup.py Homepage.py`, otherwise from the first session that opens a page.
+# ECS_WARMUP=0 switches it off.
+WARMUP = os.environ.get("ECS_WARMUP", "1") == "1"
+WAIT_SECONDS = 60  # longest the chart page waits for a running warm-up before computing itself
+DEFAULT_STATUSES = ["Yes", "No"]  # the chart page's checkboxes, in their order
+
+_log = get_logger(__name__)
+
+
+# The cache decorators open a spinner, which needs a session; without one Streamlit logs
+# "missing ScriptRunContext" for every cached call. Expected on this thread, so not logged.
+class _QuietWarmupThread(logging.Filter):
+    def filter(self, record):
+        return record.threadName != "warmup"
+
+
+get_logger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(_QuietWarmupThread())
+
+
+# ==== Readiness status (shared by all sessions) ====
+class Status:
+    def __init__(self):
+        self.state = "idle"  # idle -> running -> ready | failed
+        self.step = None
+        self.steps = []  # [name, seconds] in run order
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.done = threading.Event()
+
+    def as_dict(self):
+        return {
+            "state": self.state,
+            "step": self.step,
+            "steps": [{"name": name, "s": round(seconds, 3)} for name, seconds in self.steps],
+            "error": self.error,
+            "seconds": round((self.finished or time.time()) - self.started, 3) if self.started else None,
+        }
+
+
+@st.cache_resource(show_spinner=False)
+def _status():
+    return Status()
+
+
+def status():
+    return _status()
+
+
+def is_ready():
+    return _status().state == "ready"
+
+
+def wait(timeout=WAIT_SECONDS):
+    status = _status()
+    if status.state == "running":
+        status.done.wait(timeout)
+    return status.state == "ready"
+
+
+# ==== What gets warmed: the dataset, its aggregates and the chart page's default state ====
+def default_state(cube):
+    # All genders, the first job level, the full age range and both statuses, keyed exactly
+    # as the chart page keys its sidebar before anything is changed
+    ages = cube.present("Age")
+    level = sorted(cube.present("Current_Job_Level"))[0]
+    return filter_state(sorted(cube.present("Gender")), level, (ages[0], ages[-1]), DEFAULT_STATUSES)
+
+
+def warm_up(status):
+    def step(name, fn):
+        status.step = name
+        start = time.perf_counter()
+        result = fn()
+        status.steps.append([name, time.perf_counter() - start])
+        return result
+
+    df = step("load data", load_data)  # builds the columnar store from the xlsx if needed
+    version = step("dataset version", dataset_version)
+    cube = step("cube", lambda: get_cube(df, version))
+    step("entrepreneurship shares", lambda: entrepreneurship_share_by_level(cube, version))
+    step("filter index", lambda: get_filter_index(df, version))
+    step("precomputed results", lambda: precomputed(version))
+    step("worker pool", get_executor)  # process pool workers take seconds to start
+
+    # Figures are memoized together with the chart data they are built from
+    state = default_state(cube)
+    for group_col in GROUP_COLUMNS:
+        step(f"demographics ({group_col})", lambda: demographics_figures(cube, version, state, group_col))
+    step("job offers", lambda: job_offers_figures(cube, version, state, DEFAULT_STATUSES))
+
+
+def _run(status):
+    try:
+        warm_up(status)
+        status.state = "ready"
+        _log.info("Warm-up ready in %.1f s", time.time() - status.started)
+    except Exception as err:
+        # Sessions then compute what they need themselves and hit the same error there
+        status.state, status.error = "failed", f"{type(err).__name__}: {err}"
+        _log.exception("Warm-up failed at step %r", status.step)
+    finally:
+        status.step, status.finished = None, time.time()
+        status.done.set()
+
+
+@st.cache_resource(show_spinner=False)
+def _thread():
+    status = _status()
+    # Marked running before the thread exists, so a session calling wait() right after
+    # start() never sees "idle" and goes on to load the data alongside the warm-up
+    status.state, status.started = "running", time.time()
+    thread = threading.Thread(target=_run, args=(status,), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def start():
+    if WARMUP:
+        _thread()
+    return _status()
+
+
+# ==== Command line: python warmup.py Homepage.py [streamlit run options] ====
+if __name__ == "__main__":
+    from streamlit.web import cli
+
+    # The imported module, not this __main__ copy, so pages see the same status and thread
+    import warmup
+
+    warmup.start()
+    sys.exit(cli.main(["run", *sys.argv[1:]], prog_name="streamlit"))